@@ -3,8 +3,16 @@ import json
 import time
 import csv
 import re
+import fnmatch
+import glob
 import logging
 import random
+import sys
+import importlib.util
+from functools import partial
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote_plus
 
 # Import utilities and file manager directly, as Model handles core logic
 from .utils import get_mirror_link, create_html_view, find_chrome_path
@@ -16,14 +24,208 @@ try:
 except ImportError:
     pd = None
 
+# DrissionPage 导入较慢且只有搜索链接时才用到，首次搜索时再加载 (DrissionPage is slow to import and only needed for searching; load it on first use)
+_drission_available = importlib.util.find_spec("DrissionPage") is not None
+ChromiumPage = ChromiumOptions = None
+
+# orjson 解析速度明显快于标准库，未安装时回退到 json.loads (orjson parses much faster; fall back to stdlib if missing)
 try:
-    from DrissionPage import ChromiumPage, ChromiumOptions
+    import orjson
+    _json_loads = orjson.loads
 except ImportError:
-    ChromiumPage = None
+    _json_loads = json.loads
 
+# ijson 可按节点流式解析超大工作流，未安装时整体解析 (ijson streams nodes out of very large workflows; full parse when missing)
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 logger = logging.getLogger(__name__)
 
+# 预编译的正则表达式，避免在热路径中重复编译 (Precompiled patterns, kept off the hot path)
+_CHINESE_CHAR_RE = re.compile(r'[\u4e00-\u9fff]')
+_CHINESE_PREFIX_RE = re.compile(r"^[\u4e00-\u9fa5]+")
+_LEADING_SEPARATORS_RE = re.compile(r"^[-_|\s]+")
+
+# 搜索查询的URL编码函数，模块级复用；quote_plus 对无需转义的ASCII查询走快速路径 (Shared query encoder; quote_plus short-circuits on safe ASCII queries)
+_quote_query = partial(quote_plus, safe=':')
+
+# 节点控件中表示"未选择模型"的取值 (Widget values that mean "no model selected")
+_NON_MODEL_VALUES = frozenset({"default", "none", "empty", "auto", "off", "on"})
+
+# 单个工作流最多分析的节点数，以及改用流式解析的文件大小阈值 (Node cap per workflow and the size above which nodes are streamed)
+_MAX_NODES = 1000
+_STREAM_PARSE_MIN_BYTES = 8 * 1024 * 1024
+
+# 搜索链接时每处理多少个关键词保存一次CSV (How many searched keywords between CSV saves)
+_SEARCH_SAVE_INTERVAL = 10
+
+# 批量分析工作流时的最大线程数 (Upper bound on threads used to analyze workflows in a batch)
+_BATCH_MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+# macOS 默认文件系统不区分大小写，但 normcase 不转换大小写；集合查不到时再用 os.path.exists 确认
+# (macOS volumes are usually case-insensitive while normcase keeps case, so confirm set misses with os.path.exists)
+_STAT_ON_LISTING_MISS = sys.platform == 'darwin'
+
+
+def _load_drission():
+    """首次调用时导入 DrissionPage，返回是否可用 (Import DrissionPage on first call; return whether it is usable)"""
+    global ChromiumPage, ChromiumOptions
+    if ChromiumPage is None and _drission_available:
+        try:
+            from DrissionPage import ChromiumPage, ChromiumOptions
+        except ImportError:
+            logger.error("Failed to import DrissionPage.", exc_info=True)
+    return ChromiumPage is not None
+
+
+def _write_csv(path, fieldnames, rows):
+    """以 utf-8-sig 编码写出带表头的CSV文件，rows 为按 fieldnames 顺序排列的元组 (Write a CSV with header; rows are tuples in fieldnames order)"""
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        writer.writerows(rows)
+
+
+def _check_json_file(file_path):
+    """
+    仅通过首个非空白字节判断文件是否像JSON (Sniff whether a file looks like JSON from its first non-whitespace byte).
+    完整解析只在 find_missing_models 中进行一次，避免每个工作流被解析两遍。
+    The full parse happens once in find_missing_models, so workflows are no longer parsed twice.
+    """
+    with open(file_path, 'rb') as f:
+        stripped = f.read(64).lstrip()
+    return bool(stripped) and stripped[:1] in (b'{', b'[')
+
+
+def _sniff_json_file(file_path):
+    """_check_json_file 的容错版本，读取失败时视为非JSON (_check_json_file that treats unreadable files as non-JSON)"""
+    try:
+        return _check_json_file(file_path)
+    except Exception:
+        return False
+
+
+def _iter_streamed_nodes(f, seen_nodes_key):
+    """
+    用 ijson 逐个产出 nodes 数组中的节点，解析错误统一转为 ValueError (Yield nodes one at a time via ijson; parse errors surface as ValueError).
+    顶层对象出现 nodes 键时将 seen_nodes_key[0] 置为 True，用于区分空 nodes 与缺少 nodes。
+    Sets seen_nodes_key[0] once the top-level object has a 'nodes' key, to tell an empty list from a missing one.
+    """
+    def watch(events):
+        for prefix, event, value in events:
+            if not prefix and event == 'map_key' and value == 'nodes':
+                seen_nodes_key[0] = True
+            yield prefix, event, value
+    try:
+        yield from ijson.items(watch(ijson.parse(f, use_float=True)), 'nodes.item')
+    except ijson.JSONError as e:
+        raise ValueError(str(e)) from e
+
+
+def _load_workflow_nodes(workflow_file):
+    """
+    读取工作流中的节点列表，最多 _MAX_NODES 个；格式无效时返回 None (Load up to _MAX_NODES workflow nodes; None when the format is invalid).
+    大文件在安装了 ijson 时流式解析，读满上限即停止，不会把整个文件载入内存。
+    Large files are streamed when ijson is available and parsing stops at the cap, so the whole file is never held in memory.
+    """
+    with open(workflow_file, 'rb') as f:
+        if ijson is not None and os.fstat(f.fileno()).st_size >= _STREAM_PARSE_MIN_BYTES:
+            seen_nodes_key = [False]
+            nodes = list(islice(_iter_streamed_nodes(f, seen_nodes_key), _MAX_NODES))
+            # 没有产出节点时整个文件已解析完，此时才能断定缺少 nodes (With no nodes yielded the whole file was parsed, so the flag is final)
+            return nodes if nodes or seen_nodes_key[0] else None
+        workflow_json = _json_loads(f.read())
+    if not isinstance(workflow_json, dict) or 'nodes' not in workflow_json:
+        return None
+    return workflow_json.get('nodes', [])[:_MAX_NODES]
+
+
+def _list_dir_names(directory):
+    """一次性列出目录中的条目名称 (List the entry names of a directory in a single scandir call)"""
+    try:
+        with os.scandir(directory) as entries:
+            return {os.path.normcase(entry.name) for entry in entries}
+    except OSError:
+        return set()
+
+
+def _find_pattern_files(directory, file_pattern):
+    """按分号分隔的通配符列出目录中匹配的文件，每个文件只返回一次
+    (List the files in a directory matching any of the ';'-separated glob patterns, each file once)"""
+    patterns = [p.strip() for p in file_pattern.split(';') if p.strip()]
+    if any('/' in p or '\\' in p for p in patterns):
+        # 含子目录的模式交给 glob 处理 (Patterns reaching into subdirectories are left to glob)
+        return sorted({f for p in patterns for f in glob.glob(os.path.join(directory, p)) if os.path.isfile(f)})
+    # 所有模式合并为一个正则，目录只扫描一次；与 glob 一致，不以点开头的模式不匹配隐藏文件
+    # (One combined regex and a single scandir; like glob, patterns not starting with '.' skip dotfiles)
+    matcher = re.compile('|'.join(('' if p.startswith('.') else r'(?!\.)') + fnmatch.translate(p) for p in patterns),
+                         re.IGNORECASE if os.name == 'nt' else 0)
+    try:
+        with os.scandir(directory) as entries:
+            return sorted(entry.path for entry in entries if matcher.match(entry.name) and entry.is_file())
+    except OSError:
+        return []
+
+
+def _needs_stat(name):
+    """名称无法用扁平目录列表判断时返回True (True when a flat directory listing cannot answer for this name)"""
+    return not name or '/' in name or '\\' in name or name in ('.', '..')
+
+
+def _name_exists(name, base_dir, known_names):
+    """
+    用预先列出的目录条目判断文件是否存在 (Check existence against pre-listed directory entries).
+    含路径分隔符等无法用集合判断的名称回退到 os.path.exists。
+    Names that a flat listing cannot answer (separators, empty, dot entries) fall back to os.path.exists.
+    """
+    if _needs_stat(name):
+        return os.path.exists(name) or os.path.exists(os.path.join(base_dir, name))
+    if os.path.normcase(name) in known_names:
+        return True
+    return _STAT_ON_LISTING_MISS and (os.path.exists(name) or os.path.exists(os.path.join(base_dir, name)))
+
+
+def _model_stems(known_names, model_extensions):
+    """收集带模型扩展名条目的主文件名 (Collect stems of entries that carry a model extension)"""
+    extensions = {os.path.normcase(ext) for ext in model_extensions}
+    stems = set()
+    for entry_name in known_names:
+        stem, ext = os.path.splitext(entry_name)
+        if ext in extensions:
+            stems.add(stem)
+    return stems
+
+
+def _model_file_exists(filename, base_dir, known_names, model_stems, model_extensions, model_ext_suffixes):
+    """判断模型文件是否存在，无扩展名时按任一模型扩展名匹配 (Check whether a model file exists; extensionless names match any model extension)"""
+    if _name_exists(filename, base_dir, known_names):
+        return True
+    # 先用 endswith 快速判断常见模型扩展名，只有不匹配时才 splitext (Cheap suffix check first; splitext only on a miss)
+    if filename.endswith(model_ext_suffixes) or os.path.splitext(filename)[1]:
+        return False
+    # 无扩展名时用一次集合查找代替逐个扩展名拼接检查 (One stem lookup replaces the per-extension fan-out)
+    if _needs_stat(filename) or _STAT_ON_LISTING_MISS and os.path.normcase(filename) not in model_stems:
+        return any(_name_exists(f"{filename}{model_ext}", base_dir, known_names) for model_ext in model_extensions)
+    return os.path.normcase(filename) in model_stems
+
+
+def _apply_row_updates(df, pending_updates):
+    """按列批量写回缓存的单元格更新并清空缓存 (Write buffered cell updates back column by column, then clear them)"""
+    if not pending_updates:
+        return
+    columns = {}
+    for df_idx, row_updates in pending_updates.items():
+        for col, value in row_updates.items():
+            indices, values = columns.setdefault(col, ([], []))
+            indices.append(df_idx)
+            values.append(value)
+    for col, (indices, values) in columns.items():
+        df.loc[indices, col] = values
+    pending_updates.clear()
+
+
 class AnalysisModel:
     """
     Handles the core logic for analyzing workflows, finding models,
@@ -35,20 +237,18 @@ class AnalysisModel:
         """初始化分析模型"""
         self.controller = controller
         self.model_folder = None # Used to cache value
+        # 最近一次批量处理的结果，供调用方直接使用而不必重新读取刚写出的CSV
+        # (Results of the last batch run, so callers need not re-read the CSVs it just wrote)
+        self.last_batch_rows = [] # [(工作流文件名, 缺失数量)]，按工作流排序
+        self.last_batch_missing_csv = None # 汇总缺失文件CSV路径
         
-        # 初始化配置管理器
+        # 初始化配置管理器；模型配置在每次分析时从中读取，以反映模型配置页的修改
         self.config_manager = ModelConfigManager()
         
-        # 使用配置管理器获取数据
-        self.model_node_types = self.config_manager.get_model_node_types()
-        self.node_model_indices = self.config_manager.get_node_model_indices()
-        self.model_extensions = self.config_manager.get_model_extensions()
-        
         logger.info("AnalysisModel initialized.")
-        self._chinese_char_pattern = re.compile(r'[\u4e00-\u9fff]')
         if pd is None:
             logger.error("Pandas library is not installed, search/batch functionality might be affected.")
-        if ChromiumPage is None:
+        if not _drission_available:
             logger.error("DrissionPage library is not installed, search functionality will not work.")
 
     def _get_corrected_name_if_possible(self, original_name):
@@ -85,16 +285,14 @@ class AnalysisModel:
                     logger.debug(f"_process_name_for_search - 保留完整名称 (特殊后缀): '{mapped_name}'")
                     pass # 保留 mapped_name
                 else: # 尝试移除前缀
-                    prefix_pattern = re.compile(r"^[\u4e00-\u9fa5]+")
-                    if re.search(r"^[\u4e00-\u9fa5]", mapped_name):
-                        temp_name = re.sub(prefix_pattern, "", mapped_name).strip()
-                        name_after_prefix_removal = re.sub(r"^[-_|\s]+", "", temp_name).strip()
+                    if _CHINESE_PREFIX_RE.match(mapped_name):
+                        temp_name = _CHINESE_PREFIX_RE.sub("", mapped_name).strip()
+                        name_after_prefix_removal = _LEADING_SEPARATORS_RE.sub("", temp_name).strip()
                         logger.debug(f"_process_name_for_search - 移除中文前缀: '{mapped_name}' -> '{name_after_prefix_removal}'")
             # 如果没有下划线，但以中文开头
-            elif re.search(r"^[\u4e00-\u9fa5]", mapped_name):
-                 prefix_pattern = re.compile(r"^[\u4e00-\u9fa5]+")
-                 temp_name = re.sub(prefix_pattern, "", mapped_name).strip()
-                 name_after_prefix_removal = re.sub(r"^[-_|\s]+", "", temp_name).strip()
+            elif _CHINESE_PREFIX_RE.match(mapped_name):
+                 temp_name = _CHINESE_PREFIX_RE.sub("", mapped_name).strip()
+                 name_after_prefix_removal = _LEADING_SEPARATORS_RE.sub("", temp_name).strip()
                  logger.debug(f"_process_name_for_search - 移除中文前缀: '{mapped_name}' -> '{name_after_prefix_removal}'")
 
         final_search_term = name_after_prefix_removal
@@ -131,23 +329,22 @@ class AnalysisModel:
                     return filename_after_correction # 保留修正后的完整名称
 
         # 如果不符合上述特殊保留条件，则尝试移除中文前缀
-        prefix_pattern = re.compile(r"^[\u4e00-\u9fa5]+")
-        if re.search(r"^[\u4e00-\u9fa5]", filename_after_correction): # 对修正后的名称判断和操作
-            filename_no_prefix = re.sub(prefix_pattern, "", filename_after_correction).strip()
-            filename_no_prefix = re.sub(r"^[-_|\s]+", "", filename_no_prefix).strip() # 移除前导分隔符
+        if _CHINESE_PREFIX_RE.match(filename_after_correction): # 对修正后的名称判断和操作
+            filename_no_prefix = _CHINESE_PREFIX_RE.sub("", filename_after_correction).strip()
+            filename_no_prefix = _LEADING_SEPARATORS_RE.sub("", filename_no_prefix).strip() # 移除前导分隔符
             return filename_no_prefix
         
         return filename_after_correction # 如果没有中文前缀，返回修正后的名称
 
     def _contains_chinese(self, text):
-        if not isinstance(text, str): return False
-        return bool(self._chinese_char_pattern.search(text))
+        return isinstance(text, str) and _CHINESE_CHAR_RE.search(text) is not None
 
-    def _get_search_url(self, name_for_decision, term_for_query_embedding, node_type=None):
+    def _get_search_url(self, name_for_decision, term_for_query_embedding, node_type=None, is_chinese=None):
         """
         Generates search URLs.
         name_for_decision: Name after mapping, before prefix removal. Used for search strategy.
         term_for_query_embedding: Final term (after mapping and prefix removal) to be embedded in the site query.
+        is_chinese: Precomputed _contains_chinese(name_for_decision), computed here if not given.
         """
         logger.debug(f"Generating search URL. Decision Name: '{name_for_decision}', Query Embedding Term: '{term_for_query_embedding}', Node Type: {node_type}")
 
@@ -155,7 +352,8 @@ class AnalysisModel:
              logger.debug("Applying special rule for ip-adapter.bin + InstantIDModelLoader")
              return ("https://www.bing.com/?setlang=en-US", 'site:huggingface.co "ip-adapter.bin InstantID"')
 
-        if self._contains_chinese(name_for_decision): # 用映射后的名称（但未移除中文前缀的）判断是否搜LibLib
+        if is_chinese is None: is_chinese = self._contains_chinese(name_for_decision)
+        if is_chinese: # 用映射后的名称（但未移除中文前缀的）判断是否搜LibLib
             logger.debug(f"Decision name '{name_for_decision}' suggests Chinese model, using LibLib search with query term '{term_for_query_embedding}'.")
             return f"https://www.bing.com/?setlang=en-US", f'site:liblib.art "{term_for_query_embedding}"'
         else:
@@ -164,70 +362,59 @@ class AnalysisModel:
 
     def find_missing_models(self, workflow_file):
         logger.info(f"Analyzing workflow file: {workflow_file}")
-        base_dir = os.path.dirname(os.path.abspath(workflow_file))
+        # 批量处理传入的已是绝对路径，无需再次规范化 (Batch callers already pass absolute paths; skip re-normalizing them)
+        abs_path = workflow_file if os.path.isabs(workflow_file) else os.path.abspath(workflow_file)
+        base_dir = os.path.dirname(abs_path)
         missing_files_list = []
         try:
-            with open(workflow_file, 'r', encoding='utf-8', errors='ignore') as f:
-                workflow_json = json.load(f)
-            if not isinstance(workflow_json, dict) or 'nodes' not in workflow_json:
+            nodes = _load_workflow_nodes(workflow_file)
+            if nodes is None:
                 logger.error(f"Invalid workflow format in {workflow_file}")
                 return []
 
             # 使用配置管理器获取配置数据，而不是硬编码
-            node_model_indices = self.node_model_indices
-            model_extensions = self.model_extensions
-            model_node_types = self.model_node_types
-
-            file_references = []
-            nodes = workflow_json.get('nodes', [])
-            if len(nodes) > 1000: nodes = nodes[:1000]
-
+            # 每次调用都从配置管理器读取，反映配置页的修改；节点类型转为frozenset以O(1)查找
+            # (Read from the config manager on every call so config edits apply; node types become a frozenset for O(1) lookups)
+            node_model_indices = self.config_manager.get_node_model_indices()
+            model_extensions = self.config_manager.get_model_extensions()
+            model_node_types = frozenset(self.config_manager.get_model_node_types())
+            default_indices = node_model_indices.get("default", [0])
+
+            # 提取引用的同时检查存在性，单次遍历；同一文件名只处理和检查一次 (Check existence as references are extracted, in one pass; each file name is processed and checked once)
+            existence_by_filename = {}
+            known_names = model_stems = None
+            model_ext_suffixes = tuple(model_extensions)
             for node in nodes:
                 try:
                     node_type = node.get('type', '')
-                    widgets_values = node.get('widgets_values', [])
-                    # ... (其他节点属性获取和类型判断逻辑不变) ...
-                    if not (node_type in model_node_types or "Loader" in node_type) or not widgets_values: continue
+                    # 先按类型过滤，大多数非模型节点（如 KSampler、CLIPTextEncode）无需再取控件值 (Filter by type first so most non-model nodes skip the widget lookup)
+                    if node_type not in model_node_types and "Loader" not in node_type: continue
+                    widgets_values = node.get('widgets_values')
+                    if not widgets_values: continue
                     
-                    indices_to_check = node_model_indices.get(node_type, node_model_indices["default"])
+                    indices_to_check = node_model_indices.get(node_type, default_indices)
                     for index in indices_to_check:
                         if len(widgets_values) > index and isinstance(widgets_values[index], str):
                             original_value_from_widget = widgets_values[index].strip()
-                            if not original_value_from_widget or original_value_from_widget.lower() in ["default", "none", "empty", "auto", "off", "on"]: continue
+                            if not original_value_from_widget or original_value_from_widget.lower() in _NON_MODEL_VALUES: continue
                             
                             original_filename = os.path.basename(original_value_from_widget.replace('\\', '/')) if '\\' in original_value_from_widget or '/' in original_value_from_widget else original_value_from_widget
                             
-                            # 使用 _process_name_for_search 获取处理后的名称
-                            processed_names = self._process_name_for_search(original_filename)
-                            
-                            file_references.append({
-                                'node_id': node.get('id'), 'node_type': node_type,
-                                'original_filename': original_filename, # 用于报告
-                                'filename_for_check': processed_names['final_search_term'] # 用于文件存在性检查
-                            })
+                            exists = existence_by_filename.get(original_filename)
+                            if exists is None:
+                                if known_names is None:
+                                    # 工作流目录和当前目录各列出一次，之后用集合查找代替逐个 stat (List both directories once; set lookups replace per-path stat calls)
+                                    known_names = _list_dir_names(base_dir) | _list_dir_names(os.getcwd())
+                                    model_stems = _model_stems(known_names, model_extensions)
+                                # 使用 _process_name_for_search 获取处理后的名称，用于文件存在性检查
+                                filename_to_check_existence = self._process_name_for_search(original_filename)['final_search_term']
+                                exists = _model_file_exists(filename_to_check_existence, base_dir, known_names, model_stems, model_extensions, model_ext_suffixes)
+                                existence_by_filename[original_filename] = exists
+                                if not exists: logger.debug(f"Missing file: Checked='{filename_to_check_existence}', Reported='{original_filename}'")
+                            if not exists:
+                                missing_files_list.append({'node_id': node.get('id'), 'node_type': node_type, 'file_path': original_filename})
                 except Exception as node_e: logger.error(f"Error processing node ID {node.get('id', 'N/A')}", exc_info=True)
-            
-            if not file_references: return []
-            file_existence_cache = {}
-            for ref in file_references:
-                try:
-                    filename_to_check_existence = ref['filename_for_check']
-                    original_filename_for_report = ref['original_filename']
-                    name, ext = os.path.splitext(filename_to_check_existence)
-                    if filename_to_check_existence in file_existence_cache:
-                        if not file_existence_cache[filename_to_check_existence]:
-                            missing_files_list.append({'node_id': ref['node_id'], 'node_type': ref['node_type'], 'file_path': original_filename_for_report})
-                        continue
-                    exists = os.path.exists(filename_to_check_existence) or os.path.exists(os.path.join(base_dir, filename_to_check_existence))
-                    if not exists and not ext:
-                         for model_ext in model_extensions:
-                             if os.path.exists(f"{filename_to_check_existence}{model_ext}") or os.path.exists(os.path.join(base_dir, f"{filename_to_check_existence}{model_ext}")):
-                                 exists = True; break
-                    file_existence_cache[filename_to_check_existence] = exists
-                    if not exists:
-                        logger.debug(f"Missing file: Checked='{filename_to_check_existence}', Reported='{original_filename_for_report}'")
-                        missing_files_list.append({'node_id': ref['node_id'], 'node_type': ref['node_type'], 'file_path': original_filename_for_report})
-                except Exception as check_e: logger.error(f"Error checking existence (original: '{ref.get('original_filename')}', checked: '{ref.get('filename_for_check')}')", exc_info=True)
+        except ValueError as e: logger.warning(f"Invalid JSON in {workflow_file}: {e}"); raise
         except Exception as e: logger.error(f"Error in find_missing_models for {workflow_file}", exc_info=True); raise
         return sorted(missing_files_list, key=lambda x: x['file_path']) if missing_files_list else []
 
@@ -254,31 +441,29 @@ class AnalysisModel:
                         existing['node_type'] = f"{existing['node_type']},{item_data['node_type']}"
             
             final_list_for_csv = sorted(list(merged_files_for_csv.values()), key=lambda x: x['original_file_path'])
-            with open(csv_file_path, 'w', newline='', encoding='utf-8-sig') as f:
-                fieldnames = ['序号', '节点ID', '节点类型', '文件名', '状态', '下载链接', '镜像链接', '搜索链接']
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                for i, csv_item in enumerate(final_list_for_csv, 1):
-                    base_url, site_query = self._get_search_url(
-                        csv_item['name_for_decision'],
-                        csv_item['name_for_query_embedding'],
-                        csv_item['node_type']
-                    )
-                    query_param = site_query.replace(' ', '+').replace('"', '%22')
-                    search_link_url = f"https://www.bing.com/search?q={query_param}"
-                    writer.writerow({
-                        '序号': i, '节点ID': csv_item['node_id'], '节点类型': csv_item['node_type'],
-                        '文件名': csv_item['original_file_path'], # 显示原始文件名
-                        '状态': '', '下载链接': '', '镜像链接': '', '搜索链接': search_link_url
-                    })
+            fieldnames = ['序号', '节点ID', '节点类型', '文件名', '状态', '下载链接', '镜像链接', '搜索链接']
+            _write_csv(csv_file_path, fieldnames, (self._csv_row(i, csv_item) for i, csv_item in enumerate(final_list_for_csv, 1)))
             logger.info(f"CSV file successfully saved to: {os.path.abspath(csv_file_path)}")
             return csv_file_path
         except Exception as e: logger.error(f"Error creating CSV for {output_basename}", exc_info=True); return None
 
+    def _csv_row(self, index, csv_item):
+        """构建单个缺失文件的CSV行 (Build the CSV row for one missing file)"""
+        base_url, site_query = self._get_search_url(
+            csv_item['name_for_decision'],
+            csv_item['name_for_query_embedding'],
+            csv_item['node_type']
+        )
+        query_param = _quote_query(site_query) # 同时转义 & # 等会截断URL的字符 (Also escapes & and # that used to truncate the URL)
+        search_link_url = f"https://www.bing.com/search?q={query_param}"
+        # 列顺序: 序号, 节点ID, 节点类型, 文件名(显示原始文件名), 状态, 下载链接, 镜像链接, 搜索链接
+        return (index, csv_item['node_id'], csv_item['node_type'], csv_item['original_file_path'],
+                '', '', '', search_link_url)
+
 
     def search_model_links(self, csv_file, progress_callback=None):
         logger.info(f"Starting model link search for CSV: {csv_file}")
-        if pd is None or ChromiumPage is None:
+        if pd is None or not _load_drission():
              logger.error("Search cannot proceed: Missing pandas or DrissionPage."); return False
         try:
             # (CSV 读取和列处理逻辑保持不变，确保'文件名'和'节点类型'列存在且为字符串)
@@ -289,12 +474,11 @@ class AnalysisModel:
                 df[col] = df[col].fillna('').astype(str)
 
             search_tasks = []
-            for index, row in df.iterrows():
-                original_name_from_csv = row.get('文件名', '')
+            # 直接按列 zip 遍历，避免 iterrows 为每行构造 Series (Zip the columns directly; iterrows boxes every row into a Series)
+            for index, original_name_from_csv, status, hf_link, search_or_liblib_link, node_type in zip(
+                    df.index, df['文件名'].to_numpy(), df['状态'].to_numpy(), df['下载链接'].to_numpy(),
+                    df['搜索链接'].to_numpy(), df['节点类型'].to_numpy()):
                 if not original_name_from_csv: continue
-                status = row.get('状态', '')
-                hf_link = row.get('下载链接', '')
-                search_or_liblib_link = row.get('搜索链接', '')
                 is_processed = (status == '已处理')
                 has_valid_link = hf_link or (search_or_liblib_link.startswith('http') and 'liblib.art' in search_or_liblib_link)
                 if is_processed and has_valid_link: continue
@@ -304,7 +488,8 @@ class AnalysisModel:
                     'original_name_csv': original_name_from_csv,
                     'name_for_decision': processed_names['mapped'],
                     'search_term_query': processed_names['final_search_term'],
-                    'df_index': index, 'node_type': row.get('节点类型', '')
+                    'is_chinese': self._contains_chinese(processed_names['mapped']), # 每行只判断一次 (computed once per row)
+                    'df_index': index, 'node_type': node_type
                 })
             
             if not search_tasks: logger.info("No keywords require searching."); # 继续生成HTML
@@ -329,132 +514,155 @@ class AnalysisModel:
 
             if page: # 只有当浏览器成功初始化后才进行搜索循环
                 total_tasks = len(search_tasks)
-                for i, task in enumerate(search_tasks):
-                    if progress_callback: progress_callback(i + 1, total_tasks)
-                    logger.info(f"Searching ({i+1}/{total_tasks}): Query='{task['search_term_query']}' (Original: '{task['original_name_csv']}')")
+                pending_updates = {} # {df行索引: {列名: 值}}，写盘前统一批量写回DataFrame (Buffered row updates, applied in bulk before each save)
+                try:
+                    for i, task in enumerate(search_tasks):
+                        if progress_callback: progress_callback(i + 1, total_tasks)
+                        logger.info(f"Searching ({i+1}/{total_tasks}): Query='{task['search_term_query']}' (Original: '{task['original_name_csv']}')")
                     
-                    bing_url, site_query = self._get_search_url(task['name_for_decision'], task['search_term_query'], task['node_type'])
-                    df_idx = task['df_index']
-                    try:
-                        page.get(bing_url, timeout=15)
-                        time.sleep(random.uniform(0.5,1.0)) # 减少等待
-                        search_box = page.ele("#sb_form_q", timeout=5)
-                        if not search_box: df.loc[df_idx, '状态'] = '搜索错误(无搜索框)'; continue
-                        search_box.clear(); search_box.input(site_query)
-                        time.sleep(random.uniform(0.2,0.5))
+                        bing_url, site_query = self._get_search_url(task['name_for_decision'], task['search_term_query'], task['node_type'], task['is_chinese'])
+                        row_updates = pending_updates.setdefault(task['df_index'], {})
+                        try:
+                            page.get(bing_url, timeout=15)
+                            time.sleep(random.uniform(0.5,1.0)) # 减少等待
+                            search_box = page.ele("#sb_form_q", timeout=5)
+                            if not search_box: row_updates['状态'] = '搜索错误(无搜索框)'; continue
+                            search_box.clear(); search_box.input(site_query)
+                            time.sleep(random.uniform(0.2,0.5))
                         
-                        s_button = page.ele('#search_icon',timeout=3) or page.ele('xpath://button[@type="submit"]', timeout=3)
-                        if s_button: s_button.click()
-                        else: page.run_js("document.querySelector('#sb_form').submit();")
-                        page.wait.load_start(timeout=10)
+                            s_button = page.ele('#search_icon',timeout=3) or page.ele('xpath://button[@type="submit"]', timeout=3)
+                            if s_button: s_button.click()
+                            else: page.run_js("document.querySelector('#sb_form').submit();")
+                            page.wait.load_start(timeout=10)
 
-                        results_container = page.ele('#b_results', timeout=7)
-                        if not results_container: df.loc[df_idx, '状态'] = '未找到(无结果区)'; continue
+                            results_container = page.ele('#b_results', timeout=7)
+                            if not results_container: row_updates['状态'] = '未找到(无结果区)'; continue
                         
-                        first_link = results_container.ele("xpath:.//h2/a")
-                        if first_link:
-                            found_url = first_link.attr("href")
-                            logger.info(f"Found: '{first_link.text}' -> {found_url}")
-                            # (填充df的逻辑不变，基于 task['name_for_decision'] 判断中文/HF)
-                            if self._contains_chinese(task['name_for_decision']): # LibLib
-                                if found_url and 'liblib.art' in found_url:
-                                    # 确保这是一个详情页面URL而不是搜索结果
-                                    if 'bing.com' in found_url or 'search' in found_url.lower():
-                                        # 尝试从链接文本或者页面内容中提取实际的LibLib URL
-                                        liblib_url = None
-                                        try:
-                                            # 先尝试点击链接，看能否找到实际的LibLib URL
-                                            first_link.click()
-                                            page.wait.load_start(timeout=10)
-                                            current_url = page.url
-                                            if 'liblib.art' in current_url:
-                                                liblib_url = current_url
-                                                logger.info(f"Extracted real LibLib URL by following link: {liblib_url}")
-                                            else:
-                                                # 如果点击后不是LibLib网站，尝试在结果中寻找直接的LibLib链接
-                                                page.back()
-                                                liblib_links = results_container.eles("xpath:.//a[contains(@href, 'liblib.art')]")
-                                                if liblib_links:
-                                                    liblib_url = liblib_links[0].attr("href")
-                                                    logger.info(f"Found direct LibLib link in results: {liblib_url}")
-                                        except Exception as link_e:
-                                            logger.error(f"Error extracting LibLib URL: {link_e}")
-                                            page.get(bing_url, timeout=15)  # 返回搜索页
+                            first_link = results_container.ele("xpath:.//h2/a")
+                            if first_link:
+                                found_url = first_link.attr("href")
+                                logger.info(f"Found: '{first_link.text}' -> {found_url}")
+                                # (填充df的逻辑不变，基于 task['name_for_decision'] 判断中文/HF)
+                                if task['is_chinese']: # LibLib
+                                    if found_url and 'liblib.art' in found_url:
+                                        # 确保这是一个详情页面URL而不是搜索结果
+                                        if 'bing.com' in found_url or 'search' in found_url.lower():
+                                            # 尝试从链接文本或者页面内容中提取实际的LibLib URL
+                                            liblib_url = None
+                                            try:
+                                                # 先尝试点击链接，看能否找到实际的LibLib URL
+                                                first_link.click()
+                                                page.wait.load_start(timeout=10)
+                                                current_url = page.url
+                                                if 'liblib.art' in current_url:
+                                                    liblib_url = current_url
+                                                    logger.info(f"Extracted real LibLib URL by following link: {liblib_url}")
+                                                else:
+                                                    # 如果点击后不是LibLib网站，尝试在结果中寻找直接的LibLib链接
+                                                    page.back()
+                                                    liblib_links = results_container.eles("xpath:.//a[contains(@href, 'liblib.art')]")
+                                                    if liblib_links:
+                                                        liblib_url = liblib_links[0].attr("href")
+                                                        logger.info(f"Found direct LibLib link in results: {liblib_url}")
+                                            except Exception as link_e:
+                                                logger.error(f"Error extracting LibLib URL: {link_e}")
+                                                page.get(bing_url, timeout=15)  # 返回搜索页
                                             
-                                        if liblib_url:
-                                            df.loc[df_idx, '搜索链接'] = liblib_url
-                                            df.loc[df_idx, '状态'] = '已处理'
+                                            if liblib_url:
+                                                row_updates['搜索链接'] = liblib_url
+                                                row_updates['状态'] = '已处理'
+                                            else:
+                                                row_updates['搜索链接'] = found_url
+                                                row_updates['状态'] = '找到搜索链接但非直接LibLib链接'
                                         else:
-                                            df.loc[df_idx, '搜索链接'] = found_url
-                                            df.loc[df_idx, '状态'] = '找到搜索链接但非直接LibLib链接'
-                                    else:
-                                        df.loc[df_idx, '搜索链接'] = found_url
-                                        df.loc[df_idx, '状态'] = '已处理'
-                                    df.loc[df_idx, '下载链接'] = ''
-                                    df.loc[df_idx, '镜像链接'] = ''
-                                else: 
-                                    df.loc[df_idx, '状态'] = '未找到LibLib'
-                            else: # HuggingFace
-                                if found_url and 'huggingface.co' in found_url:
-                                    df.loc[df_idx, '下载链接'] = found_url.replace("/blob/", "/resolve/") if "/blob/" in found_url else found_url
-                                    df.loc[df_idx, '镜像链接'] = get_mirror_link(found_url)
-                                    df.loc[df_idx, '搜索链接'] = ''; df.loc[df_idx, '状态'] = '已处理'
-                                else: df.loc[df_idx, '状态'] = '未找到HF'
-                        else: df.loc[df_idx, '状态'] = '未找到(无链接)'
-                    except Exception as search_e: logger.error(f"Error searching for '{task['search_term_query']}'", exc_info=True); df.loc[df_idx, '状态'] = '搜索错误(异常)'
-                    finally:
-                        df.to_csv(csv_file, index=False, encoding='utf-8-sig') # Save after each
-                        time.sleep(random.uniform(0.8, 1.8)) # Shorter delay
-                if page: page.quit()
-
-            df.to_csv(csv_file, index=False, encoding='utf-8-sig')
+                                            row_updates['搜索链接'] = found_url
+                                            row_updates['状态'] = '已处理'
+                                        row_updates['下载链接'] = ''
+                                        row_updates['镜像链接'] = ''
+                                    else: 
+                                        row_updates['状态'] = '未找到LibLib'
+                                else: # HuggingFace
+                                    if found_url and 'huggingface.co' in found_url:
+                                        row_updates['下载链接'] = found_url.replace("/blob/", "/resolve/") if "/blob/" in found_url else found_url
+                                        row_updates['镜像链接'] = get_mirror_link(found_url)
+                                        row_updates['搜索链接'] = ''; row_updates['状态'] = '已处理'
+                                    else: row_updates['状态'] = '未找到HF'
+                            else: row_updates['状态'] = '未找到(无链接)'
+                        except Exception as search_e: logger.error(f"Error searching for '{task['search_term_query']}'", exc_info=True); row_updates['状态'] = '搜索错误(异常)'
+                        finally:
+                            # 每搜索 _SEARCH_SAVE_INTERVAL 个关键词才整体重写一次CSV (Rewrite the whole CSV only every _SEARCH_SAVE_INTERVAL keywords)
+                            if (i + 1) % _SEARCH_SAVE_INTERVAL == 0:
+                                _apply_row_updates(df, pending_updates)
+                                df.to_csv(csv_file, index=False, encoding='utf-8-sig')
+                            time.sleep(random.uniform(0.8, 1.8)) # Shorter delay
+                finally:
+                    # 搜索结束、出错或被中断时都保存已取得的结果 (Persist whatever was found on completion, error or interrupt)
+                    _apply_row_updates(df, pending_updates)
+                    df.to_csv(csv_file, index=False, encoding='utf-8-sig')
+                    page.quit()
+            else:
+                df.to_csv(csv_file, index=False, encoding='utf-8-sig')
+
             html_file = create_html_view(csv_file)
             return html_file if html_file else True
         except Exception as e: logger.error(f"Critical error in search_model_links for {csv_file}", exc_info=True); return False
 
 
+    def _process_batch_workflow(self, wf_path, position, total):
+        """分析单个工作流，无缺失或失败时返回None (Analyze one workflow; None when nothing is missing or it fails)"""
+        # 嗅探放在同一任务里，前面的文件还在嗅探时后面的分析已经开始 (Sniff inside the task so analysis overlaps with the remaining sniffs)
+        if not _sniff_json_file(wf_path):
+            logger.debug(f"Skipping non-JSON or invalid JSON: {wf_path}")
+            return None
+        wf_name = os.path.basename(wf_path)
+        logger.info(f"Batch processing ({position}/{total}): {wf_name}")
+        try:
+            missing_in_wf = self.find_missing_models(wf_path)
+            if missing_in_wf: return wf_path, missing_in_wf
+        except ValueError: logger.debug(f"Skipping invalid JSON: {wf_path}")
+        except Exception as e: logger.error(f"Error processing {wf_path} in batch", exc_info=True)
+        return None
+
     def batch_process_workflows(self, directory, file_pattern="*.json", progress_callback=None):
         """Processes all workflow files in a directory. 处理目录中的所有工作流文件。"""
         logger.info(f"Starting batch process for directory: {directory}, pattern: {file_pattern}")
-        import glob
-        patterns = file_pattern.split(';')
-        all_files = [f for p_item in patterns if p_item.strip() for f in glob.glob(os.path.join(directory, p_item.strip()))]
+        self.last_batch_rows, self.last_batch_missing_csv = [], None
+        # 目录只规范化一次，返回的路径即为绝对路径 (Normalize the directory once so every matched path is already absolute)
+        directory = os.path.abspath(directory)
+        all_files = _find_pattern_files(directory, file_pattern)
         if not all_files: logger.warning(f"No files found for patterns in {directory}"); return False
-        
-        workflow_files = []
-        for file_path in all_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f: json.load(f)
-                workflow_files.append(file_path)
-            except: logger.debug(f"Skipping non-JSON or invalid JSON: {file_path}")
-        if not workflow_files: logger.info("No valid JSON workflows found."); return True
 
         results_summary = []
         all_missing_dict = {}
-        for i, wf_path in enumerate(sorted(workflow_files)):
-            if progress_callback: progress_callback(i + 1, len(workflow_files))
-            logger.info(f"Batch processing ({i+1}/{len(workflow_files)}): {os.path.basename(wf_path)}")
-            try:
-                missing_in_wf = self.find_missing_models(wf_path)
-                if missing_in_wf:
-                    csv_path = self.create_csv_file(missing_in_wf, os.path.basename(wf_path))
-                    if csv_path:
-                        results_summary.append({'workflow': wf_path, 'csv': csv_path, 'missing_count': len(missing_in_wf)})
-                        for item in missing_in_wf: # item['file_path'] is original name
-                            if item['file_path'] not in all_missing_dict: all_missing_dict[item['file_path']] = item
-            except Exception as e: logger.error(f"Error processing {wf_path} in batch", exc_info=True)
+        total_files = len(all_files)
+        # 各工作流相互独立，用线程池并行嗅探和分析；结果按提交顺序汇总，保证输出稳定
+        # (Workflows are independent, so sniff and analyze them on a thread pool; results are merged in submission order for stable output)
+        with ThreadPoolExecutor(max_workers=min(_BATCH_MAX_WORKERS, total_files)) as executor:
+            results = executor.map(self._process_batch_workflow, all_files, range(1, total_files + 1), [total_files] * total_files)
+            for i, result in enumerate(results):
+                if progress_callback: progress_callback(i + 1, total_files)
+                if not result: continue
+                wf_path, missing_in_wf = result
+                # CSV 以文件名主干命名，wf.json 与 wf 会写到同一个文件，因此只在当前线程按顺序写出
+                # (CSVs are named after the file stem, so wf.json and wf share one; write them here, in order)
+                csv_path = self.create_csv_file(missing_in_wf, os.path.basename(wf_path))
+                if not csv_path: continue
+                results_summary.append({'workflow': wf_path, 'csv': csv_path, 'missing_count': len(missing_in_wf)})
+                for item in missing_in_wf: # item['file_path'] is original name
+                    if item['file_path'] not in all_missing_dict: all_missing_dict[item['file_path']] = item
 
         summary_all_missing_path, batch_results_path = None, None
         if all_missing_dict:
             summary_all_missing_path = self.create_csv_file(list(all_missing_dict.values()), "汇总缺失文件")
+        self.last_batch_missing_csv = summary_all_missing_path
         if results_summary:
+            results_summary.sort(key=lambda x: x['workflow'])
+            self.last_batch_rows = [(os.path.basename(res['workflow']), res['missing_count']) for res in results_summary]
             try:
                 batch_results_path = get_output_path("批量处理结果", "csv")
-                with open(batch_results_path, 'w', newline='', encoding='utf-8-sig') as f:
-                    writer = csv.DictWriter(f, fieldnames=['工作流文件', 'CSV文件', '缺失数量'])
-                    writer.writeheader()
-                    for res in sorted(results_summary, key=lambda x: x['workflow']):
-                        writer.writerow({'工作流文件': os.path.basename(res['workflow']), 'CSV文件': os.path.basename(res['csv']), '缺失数量': res['missing_count']})
+                _write_csv(batch_results_path, ['工作流文件', 'CSV文件', '缺失数量'],
+                           ((os.path.basename(res['workflow']), os.path.basename(res['csv']), res['missing_count'])
+                            for res in results_summary))
                 logger.info(f"Batch results summary saved to {os.path.abspath(batch_results_path)}")
             except Exception as e: logger.error("Error creating batch results CSV", exc_info=True); batch_results_path = None
         
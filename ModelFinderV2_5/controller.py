@@ -5,7 +5,6 @@ import json
 import random
 import threading
 import webbrowser
-import traceback
 import glob
 import subprocess
 import tkinter as tk
@@ -21,7 +20,7 @@ from .view import AppView
 from .utils import check_dependencies, find_chrome_path, get_mirror_link, create_html_view
 from .model_mover import ModelMover
 from .analysis_model import AnalysisModel
-from .file_manager import cleanup_old_results, get_output_path, get_results_folder
+from .file_manager import cleanup_old_results, get_output_path, get_results_folder, get_latest_date_folder, open_directory
 from .model_registry import ModelRegistry
 from .plugin_repair import PluginRepairModel  # 导入插件修复模型
 from . import __version__, __author__
@@ -29,7 +28,7 @@ from . import __version__, __author__
 logger = logging.getLogger(__name__) # Get logger for this module
 
 class AppController:
-    def __init__(self, root, view, version, author):
+    def __init__(self, root, view, version, author, startup_theme=None):
         self.root = root
         self.view = view
         self.__version__ = version
@@ -51,8 +50,12 @@ class AppController:
         self.auto_open_html = tk.BooleanVar()
         self.random_theme = tk.BooleanVar()
         self._loaded_theme = "cosmo"
+        # 启动时创建窗口所用的主题；随机主题已在启动时选定，加载设置时沿用，避免再切换一次
+        self._startup_theme = startup_theme
         self._loaded_chrome_path = ""
         self._loaded_retention_days = 30
+        # 各浏览对话框上次使用的目录 {"workflow"/"workflow_dir"/"chrome": 目录}，随设置一起保存
+        self._last_dirs = {}
 
         self.status_var = tk.StringVar(value="初始化...")
         logger.info("AppController initialized.")
@@ -93,47 +96,79 @@ class AppController:
                        "1. 选择工作流JSON文件并分析\n" \
                        "2. 等待自动搜索下载链接\n" \
                        "3. 查看HTML结果获取下载链接\n"
-        self.view.clear_log()
-        self.view.update_log(welcome_text) # Keep this for user visible log
+        self.view.update_log(welcome_text, clear_first=True) # Keep this for user visible log; replaces earlier startup lines in one write
         self.view.set_window_title(f"ComfyUI模型查找器 - Model Finder v{self.__version__} (WeChat: {self.__author__})")
 
+    def _make_progress_callback(self, set_progress):
+        """返回供工作线程调用的进度回调 (current, total)，只有整数百分比变化时才投递一次UI更新"""
+        last_pct = -1
+        def callback(current, total):
+            nonlocal last_pct
+            if total <= 0:
+                return
+            pct = current * 100 // total
+            if pct == last_pct:
+                return
+            last_pct = pct
+            self.root.after(0, set_progress, pct, f"{pct}%")
+        return callback
+
     def update_status(self, message):
         logger.debug(f"Updating status bar to: {message}")
         self.status_var.set(message)
 
     # --- UI Event Handlers ---
 
+    def _initial_dir_option(self, key):
+        """返回浏览对话框的 initialdir 参数；没有记住的目录时不传，由系统对话框沿用它自己上次的位置"""
+        last_dir = self._last_dirs.get(key)
+        return {'initialdir': last_dir} if last_dir and os.path.isdir(last_dir) else {}
+
+    def _remember_dir(self, key, path):
+        """记住浏览对话框使用的目录，变化时立即写入设置文件，不必等待点击保存设置"""
+        if self._last_dirs.get(key) == path:
+            return
+        self._last_dirs[key] = path
+        self.settings_model.update_saved('last_dirs', dict(self._last_dirs))
+
     def browse_workflow(self):
         logger.debug("Browse workflow button clicked.")
         file_path = filedialog.askopenfilename(
             title="选择工作流JSON文件",
-            filetypes=[("JSON文件", "*.json"), ("所有文件", "*.*")]
+            filetypes=[("JSON文件", "*.json"), ("所有文件", "*.*")],
+            **self._initial_dir_option("workflow")
         )
         if file_path:
             logger.info(f"Workflow file selected: {file_path}")
+            self._remember_dir("workflow", os.path.dirname(file_path))
             self.view.set_workflow_path(file_path)
         else:
             logger.debug("Workflow file selection cancelled.")
 
     def browse_workflow_dir(self):
         logger.debug("Browse workflow directory button clicked.")
-        dir_path = filedialog.askdirectory(title="选择工作流目录")
+        dir_path = filedialog.askdirectory(title="选择工作流目录", **self._initial_dir_option("workflow_dir"))
         if dir_path:
             logger.info(f"Workflow directory selected: {dir_path}")
+            self._remember_dir("workflow_dir", dir_path) # 目录选择器记住所选目录本身
             self.view.set_workflow_dir(dir_path)
         else:
             logger.debug("Workflow directory selection cancelled.")
 
     def browse_chrome(self):
         logger.debug("Browse Chrome path button clicked.")
-        initial_dir = "C:/Program Files/Google/Chrome/Application"
-        if not os.path.exists(initial_dir): initial_dir = "C:/Program Files (x86)/Google/Chrome/Application"
+        initial_dir = self._last_dirs.get("chrome")
+        if not initial_dir or not os.path.isdir(initial_dir):
+            initial_dir = "C:/Program Files/Google/Chrome/Application"
+            if not os.path.exists(initial_dir): initial_dir = "C:/Program Files (x86)/Google/Chrome/Application"
+            if not os.path.exists(initial_dir): initial_dir = "/"
         chrome_path = filedialog.askopenfilename(
             title="选择Chrome浏览器", filetypes=[("可执行文件", "*.exe")],
-            initialdir=initial_dir if os.path.exists(initial_dir) else "/"
+            initialdir=initial_dir
         )
         if chrome_path:
             logger.info(f"Chrome path selected: {chrome_path}")
+            self._remember_dir("chrome", os.path.dirname(chrome_path))
             self.view.set_chrome_path(chrome_path)
         else:
             logger.debug("Chrome path selection cancelled.")
@@ -174,7 +209,7 @@ class AppController:
                  self.root.after(0, logger.info, "分析完成: 没有发现缺失文件。")
                  self.root.after(0, self.view.update_log, "分析完成: 没有发现缺失文件。") # User message
                  self.root.after(0, self.update_status, "分析完成: 没有缺失文件")
-                 self.root.after(0, self.view.show_info, "完成", "没有发现缺失文件")
+                 self.root.after(0, self.view.show_toast, "没有发现缺失文件")
                  return
 
             self.root.after(0, logger.info, f"发现 {len(missing_files)} 个缺失文件。正在创建CSV...")
@@ -196,6 +231,11 @@ class AppController:
             # Start search
             self.root.after(0, self.search_links, csv_file)
 
+        except ValueError as e:
+             # JSON解析失败已由模型记录一行警告，这里不再输出完整堆栈 (The model already logged a one-line warning; skip the traceback)
+             self.root.after(0, self.view.update_log, f"JSON解析失败: {os.path.basename(workflow_file)}") # User message
+             self.root.after(0, self.update_status, "分析失败")
+             self.root.after(0, self.view.show_error, "分析错误", f"工作流文件不是有效的JSON:\n{e}")
         except Exception as e:
              # Log detailed error from thread
              logger.error(f"分析线程执行过程中出错: {workflow_file}", exc_info=True)
@@ -218,8 +258,7 @@ class AppController:
         # --- Search Thread ---
         def search_thread_func():
             logger.debug(f"Search thread started for: {csv_file}")
-            update_progress_callback = lambda current, total: \
-                self.root.after(0, self.view.set_progress, int((current / total) * 100), f"{int((current / total) * 100)}%") if total > 0 else None
+            update_progress_callback = self._make_progress_callback(self.view.set_progress)
 
             html_result = None
             try:
@@ -237,9 +276,9 @@ class AppController:
                     if self.auto_open_html.get():
                         self.root.after(0, logger.info,"自动打开HTML结果...")
                         self.root.after(0, self.view.update_log,"自动打开HTML结果...") # User message
-                        self.root.after(100, lambda: webbrowser.open(f"file:///{self.html_file_path}"))
+                        webbrowser.open(f"file:///{html_result}") # HTML已写完并关闭，直接在工作线程中打开
 
-                    self.root.after(0, self.view.show_info, "完成", "搜索完成，可以查看HTML结果")
+                    self.root.after(0, self.view.show_toast, "搜索完成，可以查看HTML结果")
 
                 elif html_result == True:
                      logger.info("搜索完成: 无需搜索，模型已处理或存在。")
@@ -251,7 +290,7 @@ class AppController:
                     logger.warning(f"搜索完成，但未能生成HTML结果 for {csv_file}")
                     self.root.after(0, self.view.update_log,"搜索完成，但未能生成HTML结果。") # User message
                     self.root.after(0, self.update_status,"搜索未生成HTML")
-                    self.root.after(0, self.view.show_info, "完成", "搜索完成，但未生成HTML。")
+                    self.root.after(0, self.view.show_toast, "搜索完成，但未生成HTML。")
 
             except Exception as e:
                 logger.error(f"搜索线程执行过程中出错: {csv_file}", exc_info=True)
@@ -277,16 +316,13 @@ class AppController:
             inferred_path = None
             if workflow_file:
                  try:
-                     output_dir = get_results_folder()
-                     if output_dir and os.path.isdir(output_dir): # Check if output_dir is valid
-                         date_folders = sorted([d for d in os.listdir(output_dir) if os.path.isdir(os.path.join(output_dir, d))], reverse=True)
-                         if date_folders:
-                              latest_date_dir = os.path.join(output_dir, date_folders[0])
-                              base_name = os.path.splitext(os.path.basename(workflow_file))[0]
-                              potential_html = os.path.join(latest_date_dir, f"{base_name}.html")
-                              if os.path.exists(potential_html):
-                                  inferred_path = potential_html
-                                  logger.debug(f"Inferred HTML path: {inferred_path}")
+                     latest_date_dir = get_latest_date_folder()
+                     if latest_date_dir:
+                         base_name = os.path.splitext(os.path.basename(workflow_file))[0]
+                         potential_html = os.path.join(latest_date_dir, f"{base_name}.html")
+                         if os.path.exists(potential_html):
+                             inferred_path = potential_html
+                             logger.debug(f"Inferred HTML path: {inferred_path}")
                  except Exception as e:
                      logger.error(f"Error inferring result path: {e}", exc_info=True)
 
@@ -321,8 +357,7 @@ class AppController:
         # --- Batch Thread ---
         def batch_thread_func():
             logger.info(f"Batch processing thread started for directory: {directory}")
-            update_batch_progress = lambda current, total: \
-                 self.root.after(0, self.view.set_batch_progress, int((current / total) * 100), f"{int((current / total) * 100)}%") if total > 0 else None
+            update_batch_progress = self._make_progress_callback(self.view.set_batch_progress)
 
             processed_summary_csv = None
             all_missing_summary_csv = None
@@ -331,25 +366,13 @@ class AppController:
                 self.root.after(0, self.view.update_log, f"开始批量处理目录: {directory}") # User message
                 processed_summary_csv = self.analysis_model.batch_process_workflows(directory, file_pattern, progress_callback=update_batch_progress)
 
-                # Find the "汇总缺失文件.csv"
-                try:
-                     output_dir = get_results_folder()
-                     if output_dir and os.path.isdir(output_dir):
-                         date_folders = sorted([d for d in os.listdir(output_dir) if os.path.isdir(os.path.join(output_dir, d))], reverse=True)
-                         if date_folders:
-                              latest_date_dir = os.path.join(output_dir, date_folders[0])
-                              potential_summary = os.path.join(latest_date_dir, "汇总缺失文件.csv")
-                              if os.path.exists(potential_summary):
-                                  all_missing_summary_csv = potential_summary
-                                  self.batch_summary_file_path = all_missing_summary_csv
-                                  self.root.after(0, logger.info, f"找到汇总缺失文件: {all_missing_summary_csv}")
-                                  self.root.after(0, self.view.update_log, f"找到汇总缺失文件: {os.path.basename(all_missing_summary_csv)}") # User message
-                              else: logger.warning(f"汇总缺失文件.csv not found in {latest_date_dir}")
-                         else: logger.warning(f"No date folders found in results directory: {output_dir}")
-                     else: logger.warning(f"Results directory not valid: {output_dir}")
-                except Exception as e:
-                     logger.error("查找汇总缺失文件时出错", exc_info=True)
-                     self.root.after(0, self.view.update_log, "查找汇总缺失文件时出错，请查看日志。") # User message
+                # The "汇总缺失文件.csv" written by this run (the model reports it, no folder scan needed)
+                all_missing_summary_csv = self.analysis_model.last_batch_missing_csv
+                if all_missing_summary_csv:
+                     self.batch_summary_file_path = all_missing_summary_csv
+                     self.root.after(0, logger.info, f"找到汇总缺失文件: {all_missing_summary_csv}")
+                     self.root.after(0, self.view.update_log, f"找到汇总缺失文件: {os.path.basename(all_missing_summary_csv)}") # User message
+                else: logger.warning("汇总缺失文件.csv was not produced by this batch run")
 
                 # --- Process results ---
                 if processed_summary_csv == True:
@@ -357,7 +380,7 @@ class AppController:
                      self.root.after(0, self.view.update_log,"批量处理完成，所有工作流均未发现缺失文件。") # User message
                      self.root.after(0, self.update_status,"批量处理完成: 无缺失")
                      self.root.after(0, self.view.set_batch_progress, 100, "100%")
-                     self.root.after(0, self.view.show_info, "完成", "批量处理完成，未发现缺失文件。")
+                     self.root.after(0, self.view.show_toast, "批量处理完成，未发现缺失文件。")
 
                 elif isinstance(processed_summary_csv, str) and os.path.exists(processed_summary_csv):
                     logger.info(f"批量处理完成，结果摘要: {processed_summary_csv}")
@@ -365,25 +388,17 @@ class AppController:
                     self.root.after(0, self.update_status,"批量处理完成，准备搜索...")
                     self.root.after(0, self.view.set_batch_progress, 100, "100%")
 
-                    # Update Treeview
-                    try:
-                        import pandas as pd # Local import might be slightly cleaner for threads
-                        df_summary = pd.read_csv(processed_summary_csv, encoding='utf-8-sig')
-                        self.root.after(0, self.view.clear_batch_results)
-                        for _, row in df_summary.iterrows():
-                             self.root.after(0, self.view.add_batch_result,
-                                             row.get('工作流文件', ''), row.get('缺失数量', '0'), "已分析")
-                    except Exception as e:
-                         logger.error(f"读取批量结果CSV时出错: {processed_summary_csv}", exc_info=True)
-                         self.root.after(0, self.view.update_log, f"读取批量结果CSV时出错: {os.path.basename(processed_summary_csv)}") # User message
+                    # Update Treeview from the rows the model just produced instead of re-reading its CSV
+                    rows = [(wf, count, "已分析") for wf, count in self.analysis_model.last_batch_rows]
+                    # 整个结果表格在一次UI回调中填充，而不是每行一个 after 事件
+                    self.root.after(0, self.view.set_batch_results, rows)
 
                     # --- Search based on summary ---
                     if all_missing_summary_csv:
                          self.root.after(0, self.update_status,"开始搜索汇总链接...")
                          self.root.after(0, self.view.set_batch_progress, 0, "0%") # Reset for search
 
-                         update_search_progress = lambda current, total: \
-                              self.root.after(0, self.view.set_batch_progress, int((current / total) * 100), f"{int((current / total) * 100)}%") if total > 0 else None
+                         update_search_progress = self._make_progress_callback(self.view.set_batch_progress)
 
                          logger.info(f"Starting summary search for: {all_missing_summary_csv}")
                          html_result = self.analysis_model.search_model_links(all_missing_summary_csv, progress_callback=update_search_progress)
@@ -397,13 +412,13 @@ class AppController:
                               if self.auto_open_html.get():
                                    self.root.after(0, logger.info,"自动打开HTML结果...")
                                    self.root.after(0, self.view.update_log,"自动打开HTML结果...") # User message
-                                   self.root.after(100, lambda: webbrowser.open(f"file:///{html_result}"))
-                              self.root.after(0, self.view.show_info, "完成", "批量处理和搜索完成")
+                                   webbrowser.open(f"file:///{html_result}") # HTML已写完并关闭，直接在工作线程中打开
+                              self.root.after(0, self.view.show_toast, "批量处理和搜索完成")
                          else:
                               logger.warning(f"汇总搜索完成，但未能生成HTML结果 for {all_missing_summary_csv}")
                               self.root.after(0, self.view.update_log,"汇总搜索完成，但未能生成HTML结果。") # User message
                               self.root.after(0, self.update_status,"汇总搜索未生成HTML")
-                              self.root.after(0, self.view.show_info, "完成", "批量搜索完成，但未生成HTML。")
+                              self.root.after(0, self.view.show_toast, "批量搜索完成，但未生成HTML。")
                     else:
                          logger.warning("未找到'汇总缺失文件.csv'，无法执行搜索。")
                          self.root.after(0, self.view.update_log,"未找到'汇总缺失文件.csv'，无法执行搜索。") # User message
@@ -465,9 +480,11 @@ class AppController:
         theme = self.view.get_selected_theme()
         logger.info(f"Applying theme: {theme}")
         try:
-            style = ttk.Style()
-            if theme in style.theme_names():
-                style.theme_use(theme)
+            if theme in self.view.theme_name_set:
+                style = ttk.Style()
+                # 窗口可能已按上次的主题创建，相同主题无需重新生成样式
+                if style.theme_use() != theme:
+                    style.theme_use(theme)
                 self._loaded_theme = theme # Update internal state
                 self.view.update_log(f"主题已应用: {theme}") # User message
             else:
@@ -489,7 +506,8 @@ class AppController:
                 'random_theme': self.random_theme.get(),
                 
                 'theme': self.view.get_selected_theme(), # Saves the theme currently selected in the view's combobox.
-                'retention_days': retention_days_from_view
+                'retention_days': retention_days_from_view,
+                'last_dirs': dict(self._last_dirs)
             }
             logger.debug(f"Data to be saved: {settings_to_save}")
 
@@ -522,6 +540,7 @@ class AppController:
         self._loaded_theme = loaded_settings.get('theme', 'cosmo')
         self._loaded_chrome_path = loaded_settings.get('chrome_path', '')
         self._loaded_retention_days = loaded_settings.get('retention_days', 30)
+        self._last_dirs = dict(loaded_settings.get('last_dirs') or {})
         logger.debug(f"Loaded settings values: AutoOpen={self.auto_open_html.get()}, RandomTheme={self.random_theme.get()}, Theme={self._loaded_theme}, Chrome='{self._loaded_chrome_path}', Days={self._loaded_retention_days}")
 
         if not self._loaded_chrome_path:
@@ -534,11 +553,9 @@ class AppController:
         # Determine and apply theme
         theme_to_apply = self._loaded_theme
         if self.random_theme.get():
-             valid_themes = ["cosmo", "flatly", "litera", "minty", "lumen", "sandstone",
-                           "yeti", "pulse", "united", "morph", "journal", "darkly",
-                           "superhero", "solar", "cyborg"]
-             try: theme_to_apply = random.choice(valid_themes); self._loaded_theme = theme_to_apply # Store choice
-             except IndexError: theme_to_apply = "cosmo"
+             # 窗口已按启动时随机选定的主题创建，直接沿用 (The window was created with the theme picked at startup)
+             theme_to_apply = self._startup_theme or random.choice(SettingsModel.RANDOM_THEMES)
+             self._loaded_theme = theme_to_apply # Store choice
              logger.info(f"加载设置：启用随机主题，应用: {theme_to_apply}")
              self.view.update_log(f"加载设置：启用随机主题，选择: {theme_to_apply}") # User message
         else:
@@ -556,22 +573,26 @@ class AppController:
         logger.info("Cleanup old files button clicked.")
         days = self.view.get_retention_days()
         if self.view.ask_yes_no("确认操作", f"确定要清理 {days} 天前的所有结果文件吗？\n此操作不可撤销!"):
-            try:
-                logger.info(f"开始清理超过 {days} 天的旧文件...")
-                self.view.update_log(f"开始清理 {days} 天前的旧文件...") # User message
-                cleaned_count = cleanup_old_results(days_to_keep=days) # Service call
-                if cleaned_count > 0:
-                    logger.info(f"清理完成，删除了 {cleaned_count} 个目录。")
-                    self.view.show_info("清理完成", f"已清理 {cleaned_count} 个旧结果目录")
-                    self.view.update_log(f"清理完成，删除了 {cleaned_count} 个目录。") # User message
-                else:
-                    logger.info("清理完成: 没有需要清理的旧文件。")
-                    self.view.show_info("清理完成", "没有需要清理的旧文件")
-                    self.view.update_log("没有找到需要清理的旧文件。") # User message
-            except Exception as e:
-                logger.error(f"清理文件时出错 (days={days})", exc_info=True)
-                self.view.show_error("清理失败", f"清理文件时出错: {e}")
-                self.view.update_log("清理文件时出错，请查看日志文件。") # User message
+            logger.info(f"开始清理超过 {days} 天的旧文件...")
+            self.view.update_log(f"开始清理 {days} 天前的旧文件...") # User message
+            # 删除目录可能较慢，放到后台线程执行，结果通过 root.after 回到UI线程
+            threading.Thread(target=self._cleanup_old_files_thread, args=(days,), daemon=True).start()
+
+    def _cleanup_old_files_thread(self, days):
+        try:
+            cleaned_count = cleanup_old_results(days_to_keep=days) # Service call
+            if cleaned_count > 0:
+                logger.info(f"清理完成，删除了 {cleaned_count} 个目录。")
+                self.root.after(0, self.view.show_info, "清理完成", f"已清理 {cleaned_count} 个旧结果目录")
+                self.root.after(0, self.view.update_log, f"清理完成，删除了 {cleaned_count} 个目录。") # User message
+            else:
+                logger.info("清理完成: 没有需要清理的旧文件。")
+                self.root.after(0, self.view.show_info, "清理完成", "没有需要清理的旧文件")
+                self.root.after(0, self.view.update_log, "没有找到需要清理的旧文件。") # User message
+        except Exception as e:
+            logger.error(f"清理文件时出错 (days={days})", exc_info=True)
+            self.root.after(0, self.view.show_error, "清理失败", f"清理文件时出错: {e}")
+            self.root.after(0, self.view.update_log, "清理文件时出错，请查看日志文件。") # User message
 
     def open_results_folder(self):
         logger.info("Open results folder button clicked.")
@@ -580,7 +601,7 @@ class AppController:
             if results_dir and os.path.isdir(results_dir):
                 logger.info(f"尝试打开结果文件夹: {results_dir}")
                 self.view.update_log(f"尝试打开结果文件夹: {results_dir}") # User message
-                webbrowser.open(f"file:///{results_dir}")
+                open_directory(results_dir)
                 self.view.update_log("结果文件夹已打开。") # User message
             else:
                 logger.error(f"无法打开结果文件夹: 路径无效或不存在 '{results_dir}'")
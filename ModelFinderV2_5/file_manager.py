@@ -4,21 +4,41 @@
 """
 
 import os
-import time
+import re
 import shutil
-from datetime import datetime
+from datetime import date, timedelta
 import ctypes
+import subprocess
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
+# 管理员权限在进程生命周期内不会改变，首次查询后缓存
+_is_admin = None
+
+# 结果目录在进程生命周期内基本不变，首次解析后缓存
+_results_folder = None
+
+# 输出目录下按日期命名的子文件夹，如 2025-05-30
+_DATE_DIR_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+# 已创建的当日输出目录 {日期字符串: 目录路径}，只保留当天一项
+_date_dir_cache = {}
+
 def is_admin():
-    """检查程序是否以管理员权限运行"""
-    try:
-        return ctypes.windll.shell32.IsUserAnAdmin()
-    except:
-        return False
+    """检查程序是否以管理员权限运行，结果在进程内缓存"""
+    global _is_admin
+    if _is_admin is None:
+        if not sys.platform.startswith('win'):
+            _is_admin = False
+        else:
+            try:
+                _is_admin = bool(ctypes.windll.shell32.IsUserAnAdmin())
+            except Exception:
+                _is_admin = False
+    return _is_admin
 
 def run_as_admin():
     """尝试以管理员权限重启程序"""
@@ -38,6 +58,20 @@ def run_as_admin():
         logger.error(f"请求管理员权限失败: {e}")
         return False
 
+def open_directory(path):
+    """在系统文件管理器中打开目录，不等待文件管理器退出
+    
+    参数:
+        path: 要打开的目录路径
+    """
+    if sys.platform.startswith('win'):
+        os.startfile(path)
+        return
+    # 分离会话启动 open/xdg-open，调用线程立即返回
+    opener = "open" if sys.platform == "darwin" else "xdg-open"
+    subprocess.Popen([opener, path], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL, start_new_session=True)
+
 def create_output_directory():
     """创建有组织的输出目录结构
     
@@ -45,22 +79,29 @@ def create_output_directory():
         创建的输出目录路径
     """
     try:
+        # 当天的目录已创建过且仍存在则直接返回，避免每次写文件都调用 makedirs；被用户删除时重新创建
+        date_str = date.today().isoformat()
+        date_dir = _date_dir_cache.get(date_str)
+        if date_dir and os.path.isdir(date_dir):
+            return date_dir
+        
         # 使用改进后的get_results_folder函数获取基础目录
         base_dir = get_results_folder()
         
         # 使用当前日期创建子文件夹
-        today = datetime.now()
-        date_dir = os.path.join(base_dir, f"{today.year:04d}-{today.month:02d}-{today.day:02d}")
+        date_dir = os.path.join(base_dir, date_str)
         
         # 确保目录存在
         os.makedirs(date_dir, exist_ok=True)
         
+        # 跨天后丢弃前一天的缓存
+        _date_dir_cache.clear()
+        _date_dir_cache[date_str] = date_dir
         return date_dir
     except Exception as e:
         # 如果发生错误，使用临时目录
         import tempfile
-        today = datetime.now()
-        date_str = f"{today.year:04d}-{today.month:02d}-{today.day:02d}"
+        date_str = date.today().isoformat()
         temp_dir = os.path.join(tempfile.gettempdir(), f"ModelFinder_Results/{date_str}")
         logger.error(f"创建输出目录出错: {e}, 使用临时目录: {temp_dir}")
         os.makedirs(temp_dir, exist_ok=True)
@@ -106,35 +147,73 @@ def cleanup_old_results(days_to_keep=30):
             logger.warning(f"结果目录不存在: {base_dir}")
             return 0
         
-        current_time = time.time()
-        cleaned_count = 0
+        # 日期文件夹名本身就是创建日期，直接按名称比较，无需 stat
+        cutoff_date = date.today() - timedelta(days=days_to_keep)
+        expired_dirs = []
         
-        # 检查每个日期文件夹
-        for dir_name in os.listdir(base_dir):
-            dir_path = os.path.join(base_dir, dir_name)
-            if os.path.isdir(dir_path):
-                # 获取目录修改时间
-                dir_time = os.path.getmtime(dir_path)
-                # 如果超过指定天数
-                if (current_time - dir_time) / (24 * 3600) > days_to_keep:
-                    try:
-                        shutil.rmtree(dir_path)
-                        logger.info(f"已清理旧结果目录: {dir_path}")
-                        cleaned_count += 1
-                    except Exception as e:
-                        logger.error(f"清理目录出错: {e}")
+        # 检查每个日期文件夹，先用名称过滤，scandir 的 DirEntry 自带类型信息
+        with os.scandir(base_dir) as entries:
+            for entry in entries:
+                if not _DATE_DIR_RE.match(entry.name) or not entry.is_dir(follow_symlinks=False):
+                    continue
+                try:
+                    dir_date = date.fromisoformat(entry.name)
+                except ValueError:
+                    continue
+                # 如果目录日期早于截止日期
+                if dir_date < cutoff_date:
+                    expired_dirs.append(entry.path)
+        
+        if not expired_dirs:
+            return 0
+        
+        # 多个过期目录并行删除，让磁盘 I/O 相互重叠
+        with ThreadPoolExecutor(max_workers=min(8, len(expired_dirs))) as executor:
+            cleaned_count = sum(executor.map(_remove_result_dir, expired_dirs))
         
         return cleaned_count
     except Exception as e:
         logger.error(f"清理旧结果出错: {e}")
         return 0
 
+def get_latest_date_folder():
+    """获取结果目录中最新的日期子文件夹
+    
+    返回:
+        最新日期文件夹的完整路径，没有时返回None
+    """
+    base_dir = get_results_folder()
+    # scandir 的 DirEntry 自带类型信息，无需对每个条目单独 isdir
+    with os.scandir(base_dir) as entries:
+        latest = max((entry.name for entry in entries if _DATE_DIR_RE.match(entry.name) and entry.is_dir()), default=None)
+    return os.path.join(base_dir, latest) if latest else None
+
+def _remove_result_dir(dir_path):
+    """删除单个结果目录，成功返回True"""
+    try:
+        shutil.rmtree(dir_path)
+        # 被删除的目录不能再从缓存中返回
+        _date_dir_cache.pop(os.path.basename(dir_path), None)
+        logger.info(f"已清理旧结果目录: {dir_path}")
+        return True
+    except Exception as e:
+        logger.error(f"清理目录出错: {e}")
+        return False
+
 def get_results_folder():
-    """获取结果文件夹的路径
+    """获取结果文件夹的路径，首次解析后缓存，目录被删除时重新解析
     
     返回:
         结果文件夹的完整路径
     """
+    global _results_folder
+    if _results_folder and os.path.isdir(_results_folder):
+        return _results_folder
+    _results_folder = _resolve_results_folder()
+    return _results_folder
+
+def _resolve_results_folder():
+    """定位并创建结果文件夹"""
     try:
         # 获取应用程序所在目录
         if hasattr(sys, '_MEIPASS'):
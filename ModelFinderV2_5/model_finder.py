@@ -1,13 +1,16 @@
 # model_finder/model_finder.py (Main Application Runner)
 
+import importlib
+import logging # Already loaded by the launcher's logging setup, so this costs nothing
+import os
+import random
 import sys
+import threading
 import tkinter as tk
-from tkinter import messagebox # Keep for fallback error
-import ttkbootstrap as ttk
 
-# Import Controller and View
-from .controller import AppController
-from .view import AppView
+# ttkbootstrap, the controller and the view are imported inside main()/ModelFinderApp
+# so that importing this module stays cheap; they are only loaded when the GUI starts.
+
 # Import package info (optional here, could be passed from launcher)
 from . import __version__, __author__
 
@@ -16,56 +19,196 @@ class ModelFinderApp:
     Main application class responsible for initializing
     the controller and view and starting the application.
     """
-    def __init__(self, root):
+    def __init__(self, root, startup_theme=None):
         self.root = root
         try:
+            # Import Controller and View (deferred until the window exists); inside the try so
+            # an import failure is reported instead of vanishing into Tk's callback handler
+            from .controller import AppController
+            from .view import AppView
+
             # 1. Create the View instance
             self.view = AppView(self.root)
 
             # 2. Create the Controller instance, passing root and view
-            self.controller = AppController(self.root, self.view, __version__, __author__)
+            self.controller = AppController(self.root, self.view, __version__, __author__, startup_theme=startup_theme)
 
-            # 3. Initialize the controller (loads settings, links view/controller)
-            self.controller.initialize()
+            # 3. Initialize the controller (loads settings, links view/controller) from the
+            #    event loop once pending draws are done, so the window paints first
+            self.root.after_idle(self._initialize_controller)
 
         except Exception as e:
-            import logging
-            logging.error("Error during ModelFinderApp Initialization", exc_info=True)
-            messagebox.showerror("初始化错误", f"应用程序初始化失败:\n{e}")
-            self.root.destroy() # Close window if init fails badly
-            sys.exit(1) # Exit the script
+            self._abort(e)
+
+    def _initialize_controller(self):
+        try:
+            self.controller.initialize()
+        except Exception as e:
+            self._abort(e)
+
+    def _abort(self, e):
+        """Reports a failed initialization and exits."""
+        logging.error("Error during ModelFinderApp Initialization", exc_info=e)
+        from tkinter import messagebox # Only needed on this failure path
+        messagebox.showerror("初始化错误", f"应用程序初始化失败:\n{e}")
+        self.root.destroy() # Close window if init fails badly
+        _hard_exit(1) # Exit the script
+
+def _hard_exit(code):
+    """Exits without running atexit handlers or finalizers, which can fail again on a half-built GUI."""
+    logging.shutdown() # Flush the log file before the process goes away
+    for stream in (sys.stdout, sys.stderr):
+        if stream is not None:
+            stream.flush()
+    os._exit(code)
+
+def _show_splash(root):
+    """Shows a small borderless loading window centered on screen and paints it immediately."""
+    splash = tk.Toplevel(root)
+    splash.overrideredirect(True)
+    label = tk.Label(splash, text="正在加载模型查找器... (Loading Model Finder...)", padx=30, pady=20)
+    label.pack()
+    splash.update_idletasks()
+    x = (splash.winfo_screenwidth() - splash.winfo_reqwidth()) // 2
+    y = (splash.winfo_screenheight() - splash.winfo_reqheight()) // 2
+    splash.geometry(f"+{x}+{y}")
+    splash.update()
+    return splash
+
+def _show_native_error(title, message):
+    """Shows an error dialog through the OS without creating a Tk interpreter. Returns True if shown."""
+    try:
+        if sys.platform.startswith('win'):
+            import ctypes
+            ctypes.windll.user32.MessageBoxW(0, message, title, 0x10)  # MB_ICONERROR
+            return True
+        if sys.platform == 'darwin':
+            import subprocess
+            # 文本通过 argv 传入，避免引号破坏 AppleScript
+            script = ['-e', 'on run argv',
+                      '-e', 'display dialog (item 1 of argv) with title (item 2 of argv) buttons {"OK"} with icon stop',
+                      '-e', 'end run']
+            return subprocess.run(['osascript', *script, message, title], capture_output=True).returncode == 0
+    except Exception:
+        pass
+    return False
+
+def _wait_for_exit_key(timeout=15.0):
+    """Waits for Enter on the console for at most `timeout` seconds; returns at once if there is no console."""
+    # 打包后的窗口程序或后台运行时没有可用的 stdin，input() 会报错或一直挂起
+    if sys.stdin is None or not sys.stdin.isatty():
+        return
+    print(f"按Enter键退出（{int(timeout)}秒后自动退出）...")
+    try:
+        if sys.platform.startswith('win'):
+            import msvcrt
+            import time
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                if msvcrt.kbhit():
+                    msvcrt.getwch()
+                    return
+                time.sleep(0.1)
+        else:
+            import select
+            ready, _, _ = select.select([sys.stdin], [], [], timeout)
+            if ready:
+                sys.stdin.readline()
+    except (EOFError, OSError, ValueError):
+        pass
+
+def _report_startup_failure(root, e, with_traceback):
+    """Shows a fatal startup error by whatever means still work, then exits."""
+    # Fallback error handling if GUI fails catastrophically
+    error_msg = f"程序启动失败: {type(e).__name__}: {str(e)}"
+    logging.critical(error_msg, exc_info=with_traceback)
+
+    # Ask Tk once whether the main window still exists and reuse the answer below
+    try:
+        root_alive = root is not None and bool(root.winfo_exists())
+    except tk.TclError:
+        root_alive = False
+
+    # Try to show a simple Tkinter error box if possible
+    try:
+        from tkinter import messagebox # Only needed on this failure path
+        if root_alive: # Check if root window was created
+             messagebox.showerror("启动错误", error_msg, parent=root) # Associate with root if possible
+        elif _show_native_error("启动错误", error_msg):
+             pass # Shown by the OS, no need to start a second Tk interpreter
+        elif sys.platform.startswith('linux') and not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")):
+             print(error_msg) # Headless: creating a Tk root would only fail and hide the original error
+        else: # Create temporary root if main one failed early
+             tk_root = tk.Tk()
+             tk_root.withdraw()
+             messagebox.showerror("启动错误", error_msg)
+             tk_root.destroy()
+    except Exception as me:
+         print(f"无法显示启动错误消息框: {me}")
+    finally:
+        print("\n如果遇到问题，请检查依赖是否都已安装。")
+        _wait_for_exit_key()
+        if root_alive:
+            root.destroy() # Ensure window is closed on catastrophic failure
+        _hard_exit(1) # Exit script on failure
+
+def _prewarm_controller_import():
+    """Imports the controller in the background; failures are reported by ModelFinderApp on the main thread."""
+    try:
+        importlib.import_module(".controller", __package__)
+    except Exception:
+        logging.debug("Background controller import failed; it will be retried on the main thread", exc_info=True)
 
 def main():
     """Sets up and runs the application."""
     root = None # Initialize root to None
+    # Import the controller (and with it pandas, the view and the models) on a worker thread
+    # while the main thread creates the Tk window; Tk itself must stay on the main thread.
+    # If the import fails here, ModelFinderApp repeats it and reports the error.
+    threading.Thread(target=_prewarm_controller_import, daemon=True).start()
     try:
-        # Start with a basic theme, controller will apply loaded/random theme later
-        root = ttk.Window(themename="cosmo")
-        app = ModelFinderApp(root)
+        import ttkbootstrap as ttk # Deferred: pulls in the whole theme engine
+        from ttkbootstrap.themes.standard import STANDARD_THEMES
+        from .settings_model import SettingsModel
+        # Create the window with the theme the settings will ask for (picking the random one
+        # here), so loading settings does not have to re-style every widget; cosmo for unknown names
+        settings = SettingsModel().load()
+        if settings.get('random_theme', True):
+            startup_theme = random.choice(SettingsModel.RANDOM_THEMES)
+        else:
+            startup_theme = settings.get('theme', 'cosmo')
+        if startup_theme not in STANDARD_THEMES:
+            startup_theme = "cosmo"
+        root = ttk.Window(themename=startup_theme)
+        # Keep the main window hidden and paint a splash while the view/controller are built
+        root.withdraw()
+        splash = _show_splash(root)
+        app = None
+
+        def finish_init():
+            nonlocal app
+            # Runs as a Tk callback, where exceptions would only be printed and the hidden
+            # window would never appear: report them and exit like the outer handler does
+            try:
+                app = ModelFinderApp(root, startup_theme)
+                splash.destroy()
+                root.deiconify()
+            except Exception as e:
+                try:
+                    splash.destroy()
+                except tk.TclError:
+                    pass
+                _report_startup_failure(root, e, with_traceback=not isinstance(e, (tk.TclError, ImportError)))
+
+        # Enter the event loop first so the splash stays responsive during initialization
+        root.after(10, finish_init)
         root.mainloop()
+    except (tk.TclError, ImportError) as e:
+        # Expected environment problems (no display, missing package or theme): the message says it all
+        _report_startup_failure(root, e, with_traceback=False)
     except Exception as e:
-        import logging
-        # Fallback error handling if GUI fails catastrophically
-        error_msg = f"程序启动失败: {type(e).__name__}: {str(e)}"
-        logging.critical(error_msg, exc_info=True)
-        
-        # Try to show a simple Tkinter error box if possible
-        try:
-            if root and root.winfo_exists(): # Check if root window was created
-                 messagebox.showerror("启动错误", error_msg, parent=root) # Associate with root if possible
-            else: # Create temporary root if main one failed early
-                 tk_root = tk.Tk()
-                 tk_root.withdraw()
-                 messagebox.showerror("启动错误", error_msg)
-                 tk_root.destroy()
-        except Exception as me:
-             print(f"无法显示启动错误消息框: {me}")
-        finally:
-            print("\n如果遇到问题，请检查依赖是否都已安装。")
-            input("按Enter键退出...")
-            if root and root.winfo_exists():
-                root.destroy() # Ensure window is closed on catastrophic failure
-            sys.exit(1) # Exit script on failure
+        # Anything else is a bug: keep the full traceback in the log
+        _report_startup_failure(root, e, with_traceback=True)
 
 # Note: The if __name__ == "__main__": check should be in the launcher (run_model_finder.py)
 # This file should ideally only be imported.
\ No newline at end of file
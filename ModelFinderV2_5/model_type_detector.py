@@ -92,6 +92,15 @@ class ModelTypeDetector:
         ".onnx": ["onnx_model"]
     }
     
+    # 没有任何规则命中时按扩展名给出的基本分类 (类型, 置信度)
+    FALLBACK_EXTENSION_TYPES = {
+        ".safetensors": ("checkpoint", 0.3),
+        ".ckpt": ("checkpoint", 0.4),
+        ".pt": ("embedding", 0.3),
+        ".pth": ("embedding", 0.3),
+        ".bin": ("clip", 0.3)
+    }
+    
     def __init__(self, config_file: str = None):
         """
         初始化模型类型检测器
@@ -249,16 +258,8 @@ class ModelTypeDetector:
         # 如果没有找到任何匹配项
         if not candidates:
             # 根据扩展名进行基本分类
-            if ext == '.safetensors':
-                candidates["checkpoint"] = 0.3
-            elif ext == '.ckpt':
-                candidates["checkpoint"] = 0.4
-            elif ext in ['.pt', '.pth']:
-                candidates["embedding"] = 0.3
-            elif ext == '.bin':
-                candidates["clip"] = 0.3
-            else:
-                candidates["misc"] = 0.2
+            fallback_type, fallback_confidence = self.FALLBACK_EXTENSION_TYPES.get(ext, ("misc", 0.2))
+            candidates[fallback_type] = fallback_confidence
         
         # 选择置信度最高的类型
         if candidates:
@@ -6,6 +6,9 @@ import logging # Import logging
 
 logger = logging.getLogger(__name__) # Get logger for this module
 
+# 设置相关文件都放在本模块所在目录，路径在导入时计算一次
+_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+
 class SettingsModel:
     """Handles loading and saving application settings from/to a JSON file."""
 
@@ -15,8 +18,13 @@ class SettingsModel:
         'chrome_path': '',
         'random_theme': True,
         'theme': 'cosmo', # Default theme
-        'retention_days': 30
+        'retention_days': 30,
+        'last_dirs': {} # 浏览对话框上次使用的目录
     }
+    # 启用随机主题时从这些主题中选择 (Themes picked from when random_theme is on)
+    RANDOM_THEMES = ("cosmo", "flatly", "litera", "minty", "lumen", "sandstone",
+                     "yeti", "pulse", "united", "morph", "journal", "darkly",
+                     "superhero", "solar", "cyborg")
 
     def __init__(self):
         self._settings_path = self._get_settings_path()
@@ -24,7 +32,7 @@ class SettingsModel:
 
     def _get_settings_path(self):
         """Determines the absolute path to the settings file."""
-        return os.path.join(os.path.dirname(__file__), self.SETTINGS_FILENAME)
+        return os.path.join(_MODULE_DIR, self.SETTINGS_FILENAME)
 
     def load(self):
         """
@@ -49,6 +57,15 @@ class SettingsModel:
             logger.error(f"Error reading settings file {self._settings_path}. Returning default settings.", exc_info=True)
             return self.DEFAULT_SETTINGS.copy()
 
+    def update_saved(self, key, value):
+        """
+        Updates a single key in the saved settings file, leaving the other saved values as they are.
+        Returns True on success, False on failure.
+        """
+        settings = self.load()
+        settings[key] = value
+        return self.save(settings)
+
     def save(self, settings_data):
         """
         Saves the provided settings dictionary to the JSON file.
@@ -57,8 +74,11 @@ class SettingsModel:
         """
         logger.debug(f"Attempting to save settings: {settings_data}") # Log data being saved
         try:
-            with open(self._settings_path, 'w', encoding='utf-8') as f:
+            # 先写临时文件再原子替换，写入中途出错也不会留下半截的设置文件
+            tmp_path = self._settings_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(settings_data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self._settings_path)
             logger.info(f"Settings saved successfully to {self._settings_path}")
             return True
         except Exception as e:
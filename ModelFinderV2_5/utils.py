@@ -7,6 +7,7 @@ import os
 import sys
 import subprocess
 import traceback
+import importlib.util
 from urllib.parse import urlparse, urljoin
 import csv
 # Ensure pandas is imported if check_dependencies doesn't handle it early enough
@@ -19,20 +20,28 @@ except ImportError:
     # sys.exit(1)
 
 
+# 依赖检查在进程内只需做一次 (The dependency check only needs to run once per process)
+_dependencies_checked = False
+
 def check_dependencies():
     """检查并安装缺失依赖 (Check and install missing dependencies)"""
+    global _dependencies_checked
+    if _dependencies_checked:
+        return
     required_packages = {"pandas": "pandas", "DrissionPage": "DrissionPage", "ttkbootstrap": "ttkbootstrap"}
     missing_packages = []
 
     for package, pip_name in required_packages.items():
-        try:
-            __import__(package)
+        # find_spec 只查找包而不执行其代码 (find_spec locates the package without running its code)
+        if importlib.util.find_spec(package) is not None:
             print(f"✓ {package} 已安装 (is installed)")
-        except ImportError:
+        else:
             print(f"✗ 缺少 {package} (is missing)")
             missing_packages.append(pip_name)
 
-    if missing_packages:
+    if not missing_packages:
+        _dependencies_checked = True
+    else:
         print("\n安装缺失依赖... (Installing missing dependencies...)")
         try:
             # 尝试使用国内镜像源安装 (Try installing using domestic mirror source)
@@ -339,10 +348,12 @@ def create_html_view(csv_file):
         html_content += "</tr>\n</thead>\n<tbody>\n" # Close thead, open tbody
 
         # Generate Table Rows
+        # 各单元格先收集到列表，最后一次性拼接，避免大表格逐段 += 造成的重复复制
+        row_parts = []
         row_count = 0
-        for index, row in df.iterrows():
+        for row in df.to_dict('records'):
             row_count += 1
-            html_content += "<tr>\n"
+            row_parts.append("<tr>\n")
 
             for i in range(len(display_columns)):
                 actual_col_name = display_columns[i] # Get the correct column name
@@ -356,10 +367,10 @@ def create_html_view(csv_file):
                     if isinstance(value, str):
                         if '已处理' in value or 'Found' in value: status_class = "status-processed"
                         elif '错误' in value or 'Error' in value: status_class = "status-error"
-                    html_content += f'<td class="{status_class}">{value}</td>\n'
+                    row_parts.append(f'<td class="{status_class}">{value}</td>\n')
 
                 elif actual_col_name in ['文件名', 'CSV文件', '工作流文件']:
-                    html_content += f'<td class="file-name">{value}</td>\n'
+                    row_parts.append(f'<td class="file-name">{value}</td>\n')
 
                 elif actual_col_name.lower() in ['下载链接', '镜像链接', 'hf镜像', '搜索链接']:
                     link_text = "✓" # Default symbol
@@ -391,15 +402,18 @@ def create_html_view(csv_file):
                              link_text = "✓ LibLib"
                              tooltip = "跳转到LibLib模型页面 (Go to LibLib)"
 
-                        html_content += f'<td class="{link_class}"><a href="{target_url}" target="_blank" title="{tooltip}">{link_text}</a></td>\n'
+                        row_parts.append(f'<td class="{link_class}"><a href="{target_url}" target="_blank" title="{tooltip}">{link_text}</a></td>\n')
                     else:
                         # No link
-                        html_content += '<td class="no-link">× 暂无 (None)</td>\n'
+                        row_parts.append('<td class="no-link">× 暂无 (None)</td>\n')
                 else:
                     # Other columns
-                    html_content += f'<td>{value}</td>\n'
+                    row_parts.append(f'<td>{value}</td>\n')
 
-            html_content += "</tr>\n"
+            row_parts.append("</tr>\n")
+        # 表格行不再拼接进 html_content，写文件时直接逐段写出，避免整页再复制一次
+        html_head = html_content
+        html_content = ""
 
         # --- Table End and Summary ---
         html_content += "</tbody>\n</table>\n" # Close tbody and table
@@ -867,7 +881,9 @@ def create_html_view(csv_file):
         """
 
         # Write HTML file
-        with open(html_file, 'w', encoding='utf-8') as f:
+        with open(html_file, 'w', encoding='utf-8', buffering=1 << 16) as f:
+            f.write(html_head)
+            f.writelines(row_parts)
             f.write(html_content)
         print(f"HTML视图已生成: {html_file} (HTML view generated: {html_file})")
         return html_file
@@ -5,9 +5,16 @@ import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 import os
 import logging # Import logging
+from .file_manager import open_directory
 
 logger = logging.getLogger(__name__) # Get logger for this module
 
+# 应用图标在项目根目录 (ModelFinderV2_5 的上一级)，路径在导入时计算一次
+_ICON_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Modelfinder.ico")
+
+# 日志区域最多保留的行数，长时间批处理后文本控件不会越来越慢
+_LOG_MAX_LINES = 5000
+
 class AppView:
     def __init__(self, root):
         self.root = root
@@ -30,6 +37,10 @@ class AppView:
         self.retention_days_var = tk.IntVar(value=30) # Keep default for initial display
 
         self.log_text = None
+        # 待写入日志区域的消息，在下一次空闲时合并为一次插入
+        self._log_buffer = []
+        self._log_flush_pending = False
+        self._log_clear_pending = False
         self.progress_bar = None
         self.progress_label = None
         self.batch_progress_bar = None
@@ -38,7 +49,12 @@ class AppView:
         self.view_result_button = None
         self.view_batch_html_button = None
         self.theme_dropdown = None
+        self.theme_names = () # 可用主题名，创建标签页时查询一次（保持顺序，用于下拉框）
+        self.theme_name_set = frozenset() # 同一组主题名，用于判断主题是否有效
+        self._tab_builders = {} # 延迟创建的标签页 {标签页路径: (构建方法, 标签页Frame)}
         self.status_label = None # Reference for status bar label
+        self._toast_label = None # 右下角的临时提示，首次使用时创建
+        self._toast_after_id = None
         # References for checkbuttons needed in _update_initial_settings
         self.auto_open_html_check = None
         self.auto_open_check = None # Checkbutton in batch tab
@@ -104,8 +120,7 @@ class AppView:
             # base_dir = os.path.dirname(__file__) # 当前文件(view.py)所在目录
             # icon_path = os.path.join(base_dir, "assets", "Modelfinder.ico")
             # 为简单起见，我们先假设它在项目根目录
-            project_root = os.path.dirname(os.path.dirname(__file__)) # 获取项目根目录 (ModelFinder_V2)
-            icon_path = os.path.join(project_root, "Modelfinder.ico")
+            icon_path = _ICON_PATH
 
             if os.path.exists(icon_path):
                 self.root.iconbitmap(icon_path)
@@ -133,6 +148,8 @@ class AppView:
             logger.error("Notebook not initialized before _setup_tabs call.")
             return
         logger.debug("Setting up tabs.")
+        self.theme_names = tuple(ttk.Style().theme_names()) # 获取所有可用主题，运行期间不会变化
+        self.theme_name_set = frozenset(self.theme_names)
 
         # 单个处理标签页
         self.tab_single = ttk.Frame(self.notebook, padding="10")
@@ -164,10 +181,20 @@ class AppView:
         self.notebook.add(self.tab_plugin_repair, text="插件修复")
         self._create_plugin_repair_tab()
 
-        # 设置标签页
+        # 设置标签页：内容在首次切换到该页时才创建
         self.tab_settings = ttk.Frame(self.notebook, padding="10")
         self.notebook.add(self.tab_settings, text="设置")
-        self._setup_settings_tab(self.tab_settings)
+        self._tab_builders[str(self.tab_settings)] = (self._setup_settings_tab, self.tab_settings)
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+
+    def _on_tab_changed(self, event):
+        """首次切换到延迟创建的标签页时构建其内容。"""
+        entry = self._tab_builders.pop(str(self.notebook.select()), None)
+        if entry:
+            builder, tab_frame = entry
+            logger.debug(f"Building deferred tab {tab_frame}.")
+            builder(tab_frame)
+            self._bind_settings_variables()
 
 
     def _setup_single_tab(self, tab_frame):
@@ -198,7 +225,8 @@ class AppView:
         log_frame = ttk.Frame(main_frame)
         log_frame.grid(row=6, column=0, columnspan=3, sticky="nsew", pady=(0, 5))
 
-        self.log_text = tk.Text(log_frame, height=15, wrap=tk.WORD, relief="solid", borderwidth=1)
+        self.log_text = tk.Text(log_frame, height=15, wrap=tk.WORD, relief="solid", borderwidth=1,
+                                undo=False, autoseparators=False, maxundo=0) # 只读日志，不需要撤销栈
         self.log_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar = ttk.Scrollbar(log_frame, orient=tk.VERTICAL, command=self.log_text.yview)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
@@ -283,9 +311,8 @@ class AppView:
 
         theme_select_frame = ttk.Frame(theme_frame)
         theme_select_frame.pack(fill="x", padx=10, pady=5)
-        theme_names = ttk.Style().theme_names() # 获取所有可用主题
         ttk.Label(theme_select_frame, text="选择主题:").pack(side="left", padx=(0,5))
-        self.theme_dropdown = ttk.Combobox(theme_select_frame, textvariable=self.theme_var, values=theme_names, state="readonly", width=15)
+        self.theme_dropdown = ttk.Combobox(theme_select_frame, textvariable=self.theme_var, values=self.theme_names, state="readonly", width=15)
         self.theme_dropdown.pack(side="left")
         ttk.Button(theme_select_frame, text="应用主题", command=lambda: self.controller.apply_theme() if self.controller else None).pack(side="left", padx=5)
 
@@ -477,17 +504,23 @@ class AppView:
         if not mappings:
             self._clear_irregular_name_fields(clear_id=True)
 
+    def _bind_settings_variables(self):
+        """Links the settings checkbuttons that exist so far to the controller variables."""
+        if not self.controller:
+            return
+        if self.auto_open_html_check and hasattr(self.controller, 'auto_open_html'):
+             self.auto_open_html_check.config(variable=self.controller.auto_open_html)
+        if self.auto_open_check and hasattr(self.controller, 'auto_open_html'): # Link batch tab checkbutton too
+             self.auto_open_check.config(variable=self.controller.auto_open_html)
+        if self.random_theme_check and hasattr(self.controller, 'random_theme'):
+             self.random_theme_check.config(variable=self.controller.random_theme)
+
     def _update_initial_settings(self):
         """Update widgets based on controller state after controller is set."""
         logger.debug("View updating initial settings from controller.")
         if self.controller:
             # Link checkbuttons to controller variables now that controller exists
-            if self.auto_open_html_check and hasattr(self.controller, 'auto_open_html'):
-                 self.auto_open_html_check.config(variable=self.controller.auto_open_html)
-            if self.auto_open_check and hasattr(self.controller, 'auto_open_html'): # Link batch tab checkbutton too
-                 self.auto_open_check.config(variable=self.controller.auto_open_html)
-            if self.random_theme_check and hasattr(self.controller, 'random_theme'):
-                 self.random_theme_check.config(variable=self.controller.random_theme)
+            self._bind_settings_variables()
 
             # Get initial values from controller getters
             theme = self.controller.get_loaded_theme_preference()
@@ -496,7 +529,7 @@ class AppView:
             logger.debug(f"Applying initial settings to view: Theme={theme}, Chrome='{chrome}', Days={days}")
 
             # Apply values to view widgets
-            if theme and self.theme_dropdown: self.set_selected_theme(theme)
+            if theme: self.set_selected_theme(theme) # theme_var exists even before the settings tab is built
             self.set_chrome_path(chrome) # Assuming set_chrome_path updates the var
             if self.retention_days_var : self.retention_days_var.set(days) # Directly set IntVar
         else:
@@ -504,20 +537,39 @@ class AppView:
 
 
     def update_log(self, message, clear_first=False):
-        """更新日志文本区域的内容。"""
+        """更新日志文本区域的内容。连续的消息会缓存起来，在下一次空闲时一次性写入。"""
         if hasattr(self, 'log_text') and self.log_text:
-            try:
-                self.log_text.config(state=tk.NORMAL)
-                if clear_first:
-                    self.log_text.delete('1.0', tk.END)
-                self.log_text.insert(tk.END, message + "\n")
-                self.log_text.see(tk.END)
-                self.log_text.config(state=tk.DISABLED)
-            except tk.TclError as e:
-                logger.error(f"Error updating log_text: {e}. Widget might be destroyed.")
+            if clear_first:
+                self._log_buffer.clear()
+                self._log_clear_pending = True
+            self._log_buffer.append(message + "\n")
+            if not self._log_flush_pending:
+                try:
+                    self.log_text.after_idle(self._flush_log)
+                    self._log_flush_pending = True
+                except tk.TclError as e:
+                    logger.error(f"Error scheduling log update: {e}. Widget might be destroyed.")
         else:
             logger.info(f"View Log (widget not available): {message}")
 
+    def _flush_log(self):
+        """把缓存的日志消息一次性写入文本区域。"""
+        self._log_flush_pending = False
+        text = "".join(self._log_buffer)
+        self._log_buffer.clear()
+        try:
+            self.log_text.config(state=tk.NORMAL)
+            if self._log_clear_pending:
+                self.log_text.delete('1.0', tk.END)
+                self._log_clear_pending = False
+            self.log_text.insert(tk.END, text)
+            # 超出上限时删除最早的行
+            self.log_text.delete('1.0', f'end-{_LOG_MAX_LINES}l')
+            self.log_text.see(tk.END)
+            self.log_text.config(state=tk.DISABLED)
+        except tk.TclError as e:
+            logger.error(f"Error updating log_text: {e}. Widget might be destroyed.")
+
     def clear_log(self):
         """清空日志区域。"""
         self.update_log("", clear_first=True)
@@ -531,6 +583,24 @@ class AppView:
         logger.info(f"Showing info dialog: {title} - {message}")
         messagebox.showinfo(title, message, parent=self.root)
 
+    def show_toast(self, message, duration_ms=3000):
+        """在窗口右下角短暂显示提示，不阻塞事件循环；用于无需用户确认的完成通知。"""
+        logger.info(f"Showing toast: {message}")
+        if self._toast_label is None:
+            self._toast_label = ttk.Label(self.root, style="success.Inverse.TLabel", padding=(12, 6))
+        elif self._toast_after_id:
+            self.root.after_cancel(self._toast_after_id)
+        self._toast_label.config(text=message)
+        # 放在状态栏上方，不参与 pack 布局
+        self._toast_label.place(relx=1.0, rely=1.0, x=-12, y=-36, anchor="se")
+        self._toast_label.lift()
+        self._toast_after_id = self.root.after(duration_ms, self._hide_toast)
+
+    def _hide_toast(self):
+        self._toast_after_id = None
+        if self._toast_label:
+            self._toast_label.place_forget()
+
     def show_warning(self, title, message):
         logger.warning(f"Showing warning dialog: {title} - {message}")
         messagebox.showwarning(title, message, parent=self.root)
@@ -573,17 +643,32 @@ class AppView:
     def set_progress(self, value, text):
         if self.progress_bar: self.progress_bar['value'] = value
         if self.progress_label: self.progress_label.config(text=text)
-        if self.root.winfo_exists(): self.root.update_idletasks()
 
     def set_batch_progress(self, value, text):
         if self.batch_progress_bar: self.batch_progress_bar['value'] = value
         if self.batch_progress_label: self.batch_progress_label.config(text=text)
-        if self.root.winfo_exists(): self.root.update_idletasks()
 
     def clear_batch_results(self):
         if self.result_tree:
-            for item in self.result_tree.get_children():
-                self.result_tree.delete(item)
+            children = self.result_tree.get_children()
+            if children:
+                self.result_tree.delete(*children) # 一次调用删除全部行
+
+    def set_batch_results(self, rows):
+        """用 (工作流文件, 缺失数量, 状态) 列表替换结果表格，整批在一次回调中完成"""
+        if not self.result_tree:
+            return
+        tree = self.result_tree
+        # 插入期间断开滚动条，避免每插入一行就更新一次滚动条
+        yscroll = tree.cget('yscrollcommand')
+        tree.configure(yscrollcommand='')
+        try:
+            self.clear_batch_results()
+            insert = tree.insert
+            for workflow_file, missing_count, status in rows:
+                insert("", tk.END, values=(os.path.basename(workflow_file), missing_count, status))
+        finally:
+            tree.configure(yscrollcommand=yscroll)
 
     def add_batch_result(self, workflow_file, missing_count, status): # Changed from file_name
         if self.result_tree:
@@ -1558,7 +1643,7 @@ class AppView:
         
         # 打开文件所在的文件夹
         folder_path = os.path.dirname(file_path)
-        os.startfile(folder_path)
+        open_directory(folder_path)
 
     def _show_batch_operations(self):
         """显示批量操作对话框"""
@@ -2158,14 +2243,6 @@ class AppView:
         # 右侧：文件列表
         file_list_frame = ttk.Frame(paned)
         paned.add(file_list_frame, weight=70)
-        
-        # --- 插件修复相关的UI元素引用 ---
-        self.comfyui_path_var = tk.StringVar()
-        self.repair_progress_var = tk.IntVar()
-        self.repair_status_var = tk.StringVar()
-        self.repair_plugins_tree = None
-        self.repair_button = None
-        # -------------------------------------
 
     def _create_plugin_repair_tab(self):
         """创建插件修复标签页的内容"""
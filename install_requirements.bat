@@ -25,5 +25,9 @@ if %errorlevel% neq 0 (
     echo Packages installed successfully.
 )
 
+:: Precompile the program sources so the first launch does not have to parse them
+echo Precompiling program files...
+python -m compileall -q ModelFinderV2_5 run_model_finder.py >nul
+
 echo Script finished.
 pause
\ No newline at end of file